@@ -10,10 +10,11 @@ import logging
 import sys
 from datetime import datetime, timezone
 
+from sqlalchemy import delete, select
 from sqlalchemy.orm import Session
 
 from src.core.browser import BrowserClient
-from src.core.models import ProductExtraction, GenderTarget
+from src.core.models import ProductExtraction, GenderTarget, QAStatus
 from src.core.qa_gate import run_product_qa
 from src.core.taxonomy import normalize_product_type, detect_gender_target, is_hair_relevant_by_keywords
 from src.extraction.deterministic import extract_product_deterministic
@@ -22,6 +23,9 @@ from src.storage.database import get_engine
 from src.storage.orm_models import ProductORM, ProductEvidenceORM, QuarantineDetailORM, BrandCoverageORM
 from src.storage.repository import ProductRepository
 
+# Concurrent httpx prefetch + status aggregation shared with the full extraction script
+from scripts.amend_full_extraction import prefetch_pages, status_counts
+
 logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
 logger = logging.getLogger(__name__)
 
@@ -29,12 +33,20 @@ BRAND = "amend"
 ALLOWED_DOMAINS = ["www.amend.com.br"]
 
 # Selectors from amend.yaml blueprint
-INCI_SELECTORS = [
+INCI_SELECTORS = (
     ".product-ingredients p", ".product-ingredients",
     "#ingredientes p", "#composicao p",
     '[data-tab="ingredientes"] p', ".product-description p",
-]
-NAME_SELECTORS = ["h1.product-name", "h1", ".product-title", ".product-name"]
+)
+NAME_SELECTORS = ("h1.product-name", "h1", ".product-title", ".product-name")
+
+# QA status → (stats key, log format, extra format args from (qa_result, inci_list));
+# anything not in the table is reported as quarantined
+_STATUS_REPORT = {
+    QAStatus.VERIFIED_INCI: ("verified", "  VERIFIED: %s (%d INCI)", lambda qa, inci: (len(inci or []),)),
+    QAStatus.CATALOG_ONLY: ("catalog", "  CATALOG: %s", lambda qa, inci: ()),
+}
+_QUARANTINED_REPORT = (None, "  QUARANTINED: %s - %s", lambda qa, inci: (qa.rejection_reason,))
 
 # 17 missing individual product URLs (non-kit)
 MISSING_URLS = [
@@ -90,7 +102,6 @@ CURRENT_SITE_URLS = {
     "https://www.amend.com.br/shampoo-amend-expertise-hidratacao-e-forca/p/1367-1.html",
     "https://www.amend.com.br/shampoo-amend-gold-black-hidratacao-nutritiva/p/1604-1.html",
     "https://www.amend.com.br/shampoo-amend-millenar-oleos-japoneses/p/1383-1.html",
-    "https://www.amend.com.br/shampoo-amend-millenar-oleos-japoneses/p/1383-1.html",
     "https://www.amend.com.br/shampoo-doador-de-volume-amend-expertise-volume-absoluto/p/1396-1.html",
     "https://www.amend.com.br/shampoo-equilibrante-amend-expertise-oleosidade-equilibrada/p/1377-1.html",
     "https://www.amend.com.br/shampoo-fortificante-amend-essencial-antiqueda/p/1600-1.html",
@@ -100,23 +111,27 @@ CURRENT_SITE_URLS = {
 
 def remove_discontinued(session: Session) -> int:
     """Remove products whose URLs are no longer on the current Amend site."""
-    products = session.query(ProductORM).filter(ProductORM.brand_slug == BRAND).all()
-    removed = 0
-    for p in products:
-        if p.product_url not in CURRENT_SITE_URLS:
-            # Delete evidence first (FK constraint)
-            session.query(ProductEvidenceORM).filter(
-                ProductEvidenceORM.product_id == p.id
-            ).delete(synchronize_session=False)
-            # Delete quarantine if exists
-            session.query(QuarantineDetailORM).filter(
-                QuarantineDetailORM.product_id == p.id
-            ).delete(synchronize_session=False)
-            session.delete(p)
-            logger.info(f"  Removed: {p.product_name[:60]} ({p.product_url})")
-            removed += 1
+    stale_ids = session.execute(
+        select(ProductORM.id).where(
+            ProductORM.brand_slug == BRAND,
+            ProductORM.product_url.notin_(CURRENT_SITE_URLS),
+        )
+    ).scalars().all()
+    if not stale_ids:
+        return 0
+
+    # Children first (FK constraint), then the products — 3 statements total
+    session.execute(delete(ProductEvidenceORM).where(ProductEvidenceORM.product_id.in_(stale_ids)))
+    session.execute(delete(QuarantineDetailORM).where(QuarantineDetailORM.product_id.in_(stale_ids)))
+    removed = session.execute(
+        delete(ProductORM)
+        .where(ProductORM.id.in_(stale_ids))
+        .returning(ProductORM.product_name, ProductORM.product_url)
+    ).all()
+    for name, url in removed:
+        logger.info("  Removed: %s (%s)", name[:60], url)
     session.flush()
-    return removed
+    return len(removed)
 
 
 def extract_missing(session: Session, browser: BrowserClient) -> dict:
@@ -124,20 +139,26 @@ def extract_missing(session: Session, browser: BrowserClient) -> dict:
     repo = ProductRepository(session)
     stats = {"extracted": 0, "verified": 0, "catalog": 0, "failed": 0}
 
-    # Skip URLs already in DB
+    # Skip URLs already in DB — one IN query over just the candidate URLs
     existing_urls = set(
-        r[0] for r in session.query(ProductORM.product_url)
-        .filter(ProductORM.brand_slug == BRAND)
-        .all()
+        session.execute(
+            select(ProductORM.product_url).where(ProductORM.product_url.in_(MISSING_URLS))
+        ).scalars()
     )
 
     urls_to_extract = [u for u in MISSING_URLS if u not in existing_urls]
-    logger.info(f"URLs to extract: {len(urls_to_extract)} (skipping {len(MISSING_URLS) - len(urls_to_extract)} already in DB)")
+    n = len(urls_to_extract)
+    logger.info("URLs to extract: %d (skipping %d already in DB)", n, len(MISSING_URLS) - n)
+
+    pages = prefetch_pages(urls_to_extract)
 
     for i, url in enumerate(urls_to_extract, 1):
-        logger.info(f"[{i}/{len(urls_to_extract)}] Extracting: {url}")
+        logger.info("[%d/%d] Extracting: %s", i, n, url)
         try:
-            html = browser.fetch_page(url)
+            html = pages.get(url)
+            if not html or "product-ingredients" not in html:
+                # Not server-rendered (or prefetch failed) — render in the browser
+                html = browser.fetch_page(url)
 
             det_result = extract_product_deterministic(
                 html=html, url=url,
@@ -147,7 +168,7 @@ def extract_missing(session: Session, browser: BrowserClient) -> dict:
 
             product_name = det_result.get("product_name") or ""
             if not product_name:
-                logger.warning(f"  No product name found, skipping")
+                logger.warning("  No product name found, skipping")
                 stats["failed"] += 1
                 continue
 
@@ -173,7 +194,7 @@ def extract_missing(session: Session, browser: BrowserClient) -> dict:
                 product_name=product_name,
                 product_url=url,
                 image_url_main=det_result.get("image_url_main"),
-                gender_target=GenderTarget(gender) if gender in [e.value for e in GenderTarget] else GenderTarget.UNKNOWN,
+                gender_target=GenderTarget.coerce(gender),
                 hair_relevance_reason=reason or "product_url",
                 product_type_raw=product_name,
                 product_type_normalized=product_type,
@@ -190,17 +211,13 @@ def extract_missing(session: Session, browser: BrowserClient) -> dict:
             repo.upsert_product(extraction, qa_result)
             stats["extracted"] += 1
 
-            if qa_result.status.value == "verified_inci":
-                stats["verified"] += 1
-                logger.info(f"  VERIFIED: {product_name[:50]} ({len(inci_list or [])} INCI)")
-            elif qa_result.status.value == "catalog_only":
-                stats["catalog"] += 1
-                logger.info(f"  CATALOG: {product_name[:50]}")
-            else:
-                logger.info(f"  QUARANTINED: {product_name[:50]} - {qa_result.rejection_reason}")
+            stat_key, fmt, extra_args = _STATUS_REPORT.get(qa_result.status, _QUARANTINED_REPORT)
+            if stat_key:
+                stats[stat_key] += 1
+            logger.info(fmt, product_name[:50], *extra_args(qa_result, inci_list))
 
         except Exception as e:
-            logger.error(f"  FAILED: {url} - {e}")
+            logger.error("  FAILED: %s - %s", url, e)
             stats["failed"] += 1
 
     return stats
@@ -208,11 +225,11 @@ def extract_missing(session: Session, browser: BrowserClient) -> dict:
 
 def update_coverage(session: Session):
     """Update brand coverage stats."""
-    products = session.query(ProductORM).filter(ProductORM.brand_slug == BRAND).all()
-    total = len(products)
-    verified = sum(1 for p in products if p.verification_status == "verified_inci")
-    catalog = sum(1 for p in products if p.verification_status == "catalog_only")
-    quarantined = sum(1 for p in products if p.verification_status == "quarantined")
+    counts = status_counts(session)
+    total = sum(counts.values())
+    verified = counts.get("verified_inci", 0)
+    catalog = counts.get("catalog_only", 0)
+    quarantined = counts.get("quarantined", 0)
     rate = verified / total if total > 0 else 0.0
 
     coverage = session.query(BrandCoverageORM).filter(
@@ -225,7 +242,7 @@ def update_coverage(session: Session):
         coverage.catalog_only_total = catalog
         coverage.quarantined_total = quarantined
         coverage.updated_at = datetime.now(timezone.utc)
-        logger.info(f"Coverage updated: {total} extracted, {verified} verified ({rate:.1%})")
+        logger.info("Coverage updated: %d extracted, %d verified (%.1f%%)", total, verified, rate * 100)
 
 
 def main():
@@ -236,26 +253,26 @@ def main():
         logger.info("STEP 1: Removing discontinued products...")
         logger.info("=" * 60)
         removed = remove_discontinued(session)
-        logger.info(f"Removed {removed} discontinued products")
+        logger.info("Removed %d discontinued products", removed)
         session.commit()
 
         # Remaining count
         remaining = session.query(ProductORM).filter(ProductORM.brand_slug == BRAND).count()
-        logger.info(f"Remaining products in DB: {remaining}")
+        logger.info("Remaining products in DB: %d", remaining)
 
         # Step 2: Extract missing products
         logger.info("")
         logger.info("=" * 60)
         logger.info("STEP 2: Extracting missing products...")
         logger.info("=" * 60)
-        browser = BrowserClient(headless=True, delay_seconds=2)
+        browser = BrowserClient(headless=True, delay_seconds=2, settle_ms=500)
         try:
             stats = extract_missing(session, browser)
             session.commit()
         finally:
             browser.close()
 
-        logger.info(f"\nExtraction results: {stats}")
+        logger.info("\nExtraction results: %s", stats)
 
         # Step 3: Update coverage
         logger.info("")
@@ -266,14 +283,12 @@ def main():
         session.commit()
 
         # Final summary
-        final_count = session.query(ProductORM).filter(ProductORM.brand_slug == BRAND).count()
-        final_verified = session.query(ProductORM).filter(
-            ProductORM.brand_slug == BRAND,
-            ProductORM.verification_status == "verified_inci"
-        ).count()
+        counts = status_counts(session)
+        final_count = sum(counts.values())
+        final_verified = counts.get("verified_inci", 0)
         logger.info("")
         logger.info("=" * 60)
-        logger.info(f"FINAL: {final_count} products, {final_verified} verified INCI")
+        logger.info("FINAL: %d products, %d verified INCI", final_count, final_verified)
         logger.info("=" * 60)
 
 
@@ -3,7 +3,8 @@
 Comprehensive Amend product extraction — ALL categories, ALL products (including kits & coloração).
 
 Phase 1: Discover all product URLs by paginating AJAX category endpoints
-Phase 2: Extract product data via BrowserClient + deterministic pipeline
+Phase 2: Prefetch product HTML concurrently via httpx, extract via deterministic
+         pipeline (BrowserClient fallback for pages missing the INCI block)
 Phase 3: Update coverage stats
 
 Usage:
@@ -13,19 +14,26 @@ Usage:
 from __future__ import annotations
 
 import argparse
+import asyncio
 import logging
+import multiprocessing
 import os
+import re
 import sys
 import time
+from collections.abc import Callable
+from concurrent.futures import Future, ProcessPoolExecutor
 from datetime import datetime, timezone
 from urllib.parse import urljoin
 
 import httpx
 from bs4 import BeautifulSoup
+from sqlalchemy import func, select
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
 from src.core.browser import BrowserClient
-from src.core.models import ProductExtraction, GenderTarget
+from src.core.models import ProductExtraction, GenderTarget, QAResult
 from src.core.qa_gate import run_product_qa
 from src.core.taxonomy import normalize_product_type, detect_gender_target, is_hair_relevant_by_keywords
 from src.extraction.deterministic import extract_product_deterministic
@@ -57,7 +65,7 @@ CATEGORIES = [
 ]
 
 # Blueprint selectors for extraction
-INCI_SELECTORS = [
+INCI_SELECTORS = (
     ".product-ingredients p",
     ".product-ingredients",
     "p.description-product-page",
@@ -66,16 +74,87 @@ INCI_SELECTORS = [
     "#composicao p",
     '[data-tab="ingredientes"] p',
     ".product-description p",
-]
-NAME_SELECTORS = ["h1.product-name", "h1", ".product-title", ".product-name"]
-
-BATCH_COMMIT_SIZE = 20
+)
+NAME_SELECTORS = ("h1.product-name", "h1", ".product-title", ".product-name")
+
+# Commit when either threshold is hit: enough pending upserts, or enough time
+# since the last commit (bounds lost work if the browser hangs mid-batch)
+BATCH_COMMIT_SIZE = 50
+BATCH_COMMIT_SECONDS = 30.0
+
+# Concurrent product-page prefetch (Phase 2); BrowserClient only for fallbacks
+FETCH_CONCURRENCY = 8
+# Worker processes for HTML parsing + INCI validation (CPU-bound)
+PARSE_WORKERS = os.cpu_count() or 2
+_USER_AGENT = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36"
+# Marker for server-rendered INCI block — pages without it need the browser
+_INCI_MARKER = "product-ingredients"
 
 # Demandware/SFCC uses sz param for page size — sz=500 returns all in one request
 SFCC_PAGE_SIZE = 500
 
-# Exclusion patterns for non-product links
-_NON_PRODUCT = ("/on/demandware", "/busca/", "/carrinho", "/login", "/wishlist")
+# Exclusion patterns for non-product links, as one compiled alternation
+_NON_PRODUCT_RE = re.compile(r"/on/demandware|/busca/|/carrinho|/login|/wishlist")
+
+
+# Category pages are fetched concurrently; this caps in-flight requests to the host
+CATEGORY_CONCURRENCY = 4
+# HTTP/2 lets the concurrent category requests multiplex over one TLS connection,
+# so max_connections no longer bounds them — _discover_async uses a semaphore
+_DISCOVERY_LIMITS = httpx.Limits(
+    max_keepalive_connections=CATEGORY_CONCURRENCY,
+    max_connections=CATEGORY_CONCURRENCY,
+    keepalive_expiry=30.0,
+)
+_DISCOVERY_TIMEOUT = httpx.Timeout(30.0, connect=5.0)
+
+
+def _parse_category_page(html: str) -> tuple[int, set[str]]:
+    """Return (tile count, product URLs) for one SFCC AJAX category page."""
+    soup = BeautifulSoup(html, "lxml")
+
+    tiles = soup.select(".grid-tile, .product-tile")
+    cat_urls: set[str] = set()
+
+    for tile in tiles:
+        for a in tile.find_all("a", href=True):
+            href = a["href"]
+            if ".html" not in href:
+                continue
+            if _NON_PRODUCT_RE.search(href):
+                continue
+            full = urljoin(BASE + "/", href.split("?")[0])
+            if "amend.com.br" in full:
+                cat_urls.add(full)
+                break  # first product link per tile
+
+    return len(tiles), cat_urls
+
+
+async def _discover_async() -> list[tuple[str, int, set[str]] | None]:
+    loop = asyncio.get_running_loop()
+    sem = asyncio.Semaphore(CATEGORY_CONCURRENCY)
+
+    async def fetch_category(client: httpx.AsyncClient, cat: str) -> tuple[str, int, set[str]] | None:
+        url = f"{BASE}/busca/?cgid={cat}&format=ajax&start=0&sz={SFCC_PAGE_SIZE}"
+        try:
+            async with sem:
+                resp = await client.get(url)
+            # Parse off the event loop so it overlaps the remaining fetches
+            n_tiles, cat_urls = await loop.run_in_executor(None, _parse_category_page, resp.text)
+            return cat, n_tiles, cat_urls
+        except Exception as e:
+            logger.warning("  Failed category '%s': %s", cat, e)
+            return None
+
+    async with httpx.AsyncClient(
+        headers={"User-Agent": _USER_AGENT},
+        timeout=_DISCOVERY_TIMEOUT,
+        follow_redirects=True,
+        http2=True,
+        limits=_DISCOVERY_LIMITS,
+    ) as client:
+        return await asyncio.gather(*(fetch_category(client, c) for c in CATEGORIES))
 
 
 def discover_all_urls() -> set[str]:
@@ -86,47 +165,20 @@ def discover_all_urls() -> set[str]:
       - /product-name/p/ID.html   (old format)
       - /product-name/ID.html     (new format, no /p/)
       - /p/ID.html                (short format)
+
+    All categories are fetched concurrently (bounded by CATEGORY_CONCURRENCY).
     """
     all_urls: set[str] = set()
-    client = httpx.Client(
-        headers={"User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36"},
-        timeout=30.0,
-        follow_redirects=True,
-    )
 
-    try:
-        for cat in CATEGORIES:
-            url = f"{BASE}/busca/?cgid={cat}&format=ajax&start=0&sz={SFCC_PAGE_SIZE}"
-            try:
-                resp = client.get(url)
-                soup = BeautifulSoup(resp.text, "html.parser")
-
-                tiles = soup.select(".grid-tile, .product-tile")
-                cat_urls: set[str] = set()
-
-                for tile in tiles:
-                    for a in tile.find_all("a", href=True):
-                        href = a["href"]
-                        if ".html" not in href:
-                            continue
-                        if any(ex in href for ex in _NON_PRODUCT):
-                            continue
-                        full = urljoin(BASE + "/", href.split("?")[0])
-                        if "amend.com.br" in full:
-                            cat_urls.add(full)
-                            break  # first product link per tile
-
-                all_urls.update(cat_urls)
-                logger.info(
-                    f"  Category '{cat}': {len(tiles)} tiles → {len(cat_urls)} URLs "
-                    f"(running total: {len(all_urls)})"
-                )
-            except Exception as e:
-                logger.warning(f"  Failed category '{cat}': {e}")
-
-            time.sleep(0.3)
-    finally:
-        client.close()
+    for result in asyncio.run(_discover_async()):
+        if result is None:
+            continue
+        cat, n_tiles, cat_urls = result
+        all_urls.update(cat_urls)
+        logger.info(
+            "  Category '%s': %d tiles → %d URLs (running total: %d)",
+            cat, n_tiles, len(cat_urls), len(all_urls),
+        )
 
     return all_urls
 
@@ -144,12 +196,59 @@ def classify_urls(urls: set[str]) -> tuple[list[str], list[str]]:
     return individual, kits
 
 
-def extract_single_product(
-    url: str, browser: BrowserClient, repo: ProductRepository, session: Session
-) -> str:
-    """Extract one product and return its status ('verified'|'catalog'|'quarantined'|'failed')."""
-    html = browser.fetch_page(url)
+async def _prefetch_async(
+    urls: list[str], on_fetched: Callable[[str, str], bool] | None = None
+) -> dict[str, str | None]:
+    sem = asyncio.Semaphore(FETCH_CONCURRENCY)
 
+    async def bounded_fetch(client: httpx.AsyncClient, url: str) -> tuple[str, str | None]:
+        async with sem:
+            try:
+                resp = await client.get(url)
+                resp.raise_for_status()
+            except httpx.HTTPError as e:
+                logger.warning("  Prefetch failed for %s: %s", url, e)
+                return url, None
+            if on_fetched is not None:
+                # A failing callback (e.g. BrokenProcessPool on submit) must not
+                # abort the whole gather: drop just this page to the fallback path
+                try:
+                    taken = on_fetched(url, resp.text)
+                except Exception as e:
+                    logger.warning("  Hand-off failed for %s: %s", url, e)
+                    return url, None
+                if taken:
+                    return url, None  # handed off; don't keep the HTML resident
+            return url, resp.text
+
+    async with httpx.AsyncClient(
+        headers={"User-Agent": _USER_AGENT},
+        timeout=30.0,
+        follow_redirects=True,
+        limits=httpx.Limits(max_connections=FETCH_CONCURRENCY),
+    ) as client:
+        results = await asyncio.gather(*(bounded_fetch(client, u) for u in urls))
+    return dict(results)
+
+
+def prefetch_pages(
+    urls: list[str], on_fetched: Callable[[str, str], bool] | None = None
+) -> dict[str, str | None]:
+    """Fetch all product pages concurrently. Returns {url: html or None}.
+
+    ``on_fetched(url, html)`` is called as each page arrives, so callers can
+    start processing it while the remaining fetches are still in flight. If it
+    returns True the caller has taken the page and its HTML is not kept in the
+    result (value None, same as a failed fetch).
+    """
+    return asyncio.run(_prefetch_async(urls, on_fetched))
+
+
+def build_extraction(url: str, html: str) -> ProductExtraction | None:
+    """Parse one product page into a ProductExtraction (None if no product name).
+
+    Pure CPU work with no DB or browser access, so it can run in a worker process.
+    """
     det_result = extract_product_deterministic(
         html=html,
         url=url,
@@ -159,7 +258,7 @@ def extract_single_product(
 
     product_name = det_result.get("product_name") or ""
     if not product_name:
-        return "failed"
+        return None
 
     gender = detect_gender_target(product_name, url)
     product_type = normalize_product_type(product_name)
@@ -183,11 +282,7 @@ def extract_single_product(
         product_name=product_name,
         product_url=url,
         image_url_main=det_result.get("image_url_main"),
-        gender_target=(
-            GenderTarget(gender)
-            if gender in [e.value for e in GenderTarget]
-            else GenderTarget.UNKNOWN
-        ),
+        gender_target=GenderTarget.coerce(gender),
         hair_relevance_reason=reason or "product_url",
         product_type_raw=product_name,
         product_type_normalized=product_type,
@@ -199,49 +294,131 @@ def extract_single_product(
         extraction_method=det_result.get("extraction_method"),
         evidence=det_result.get("evidence", []),
     )
+    return extraction
+
 
-    qa_result = run_product_qa(extraction, ALLOWED_DOMAINS)
-    repo.upsert_product(extraction, qa_result)
+def extract_single_product(url: str, browser: BrowserClient, html: str | None = None) -> ProductExtraction | None:
+    """Parse one product, rendering it with BrowserClient unless the prefetched
+    ``html`` already carries the INCI block."""
+    if not html or _INCI_MARKER not in html:
+        html = browser.fetch_page(url)
+    return build_extraction(url, html)
 
-    return qa_result.status.value
+
+def flush_new_products(
+    session: Session, repo: ProductRepository, buffer: list[tuple[ProductExtraction, QAResult]]
+) -> None:
+    """Insert buffered products in one Core batch and commit.
+
+    Phase 2 only sees URLs absent from the DB, so the insert-only bulk path is
+    safe. If a row appeared concurrently, the batch is retried per row through
+    upsert_product, which merges with the existing record.
+    """
+    if not buffer:
+        return
+    try:
+        repo.insert_new_products(buffer)
+        session.commit()
+    except IntegrityError:
+        session.rollback()
+        logger.warning("  Batch insert conflicted; upserting %d rows individually", len(buffer))
+        for extraction, qa_result in buffer:
+            repo.upsert_product(extraction, qa_result)
+        session.commit()
+    buffer.clear()
 
 
 def extract_products(urls: list[str], session: Session, browser: BrowserClient) -> dict:
-    """Phase 2: Extract all products from URL list."""
+    """Phase 2: Extract all products from URL list.
+
+    Pages are parsed in a process pool as soon as their prefetch completes, so
+    parsing overlaps the remaining network I/O. QA runs on the main thread, in
+    URL order; results are buffered and written with Core bulk inserts at each
+    commit point.
+    """
     repo = ProductRepository(session)
     stats = {"extracted": 0, "verified_inci": 0, "catalog_only": 0, "quarantined": 0, "failed": 0}
 
-    for i, url in enumerate(urls, 1):
-        logger.info(f"[{i}/{len(urls)}] {url}")
-        try:
-            status = extract_single_product(url, browser, repo, session)
-            if status == "failed":
+    # The first submit happens inside the prefetch event loop, after httpx has
+    # started resolver threads; forkserver avoids fork()ing a threaded process.
+    with ProcessPoolExecutor(
+        max_workers=PARSE_WORKERS, mp_context=multiprocessing.get_context("forkserver")
+    ) as pool:
+        parsed: dict[str, Future] = {}
+
+        fetched = 0
+
+        def submit_parse(url: str, html: str) -> bool:
+            # Always takes the page: without the INCI block the loop re-renders
+            # it in the browser anyway, so no prefetched HTML stays resident.
+            nonlocal fetched
+            fetched += 1
+            if _INCI_MARKER in html:
+                parsed[url] = pool.submit(build_extraction, url, html)
+            return True
+
+        n = len(urls)
+        logger.info("Prefetching %d pages (%d concurrent)...", n, FETCH_CONCURRENCY)
+        prefetch_pages(urls, on_fetched=submit_parse)
+        logger.info("Prefetched %d/%d pages (%d parsed in workers)", fetched, n, len(parsed))
+
+        buffer: list[tuple[ProductExtraction, QAResult]] = []
+        last_commit = time.monotonic()
+        for i, url in enumerate(urls, 1):
+            logger.info("[%d/%d] %s", i, n, url)
+            try:
+                # pop() so each extraction is freed once stored, instead of the
+                # whole batch staying resident until the end
+                future = parsed.pop(url, None)
+                if future is not None:
+                    extraction = future.result()
+                else:
+                    extraction = extract_single_product(url, browser)
+                if extraction is None:
+                    stats["failed"] += 1
+                    logger.warning("  SKIP: No product name found")
+                else:
+                    qa_result = run_product_qa(extraction, ALLOWED_DOMAINS)
+                    buffer.append((extraction, qa_result))
+                    status = qa_result.status.value
+                    stats["extracted"] += 1
+                    stats[status] = stats.get(status, 0) + 1
+                    logger.info("  → %s", status.upper())
+            except Exception as e:
                 stats["failed"] += 1
-                logger.warning(f"  SKIP: No product name found")
-            else:
-                stats["extracted"] += 1
-                stats[status] = stats.get(status, 0) + 1
-                logger.info(f"  → {status.upper()}")
-        except Exception as e:
-            stats["failed"] += 1
-            logger.error(f"  FAILED: {e}")
-
-        # Commit in batches
-        if i % BATCH_COMMIT_SIZE == 0:
-            session.commit()
-            logger.info(f"  --- Committed batch ({i}/{len(urls)}) ---")
-
+                logger.error("  FAILED: %s", e)
+
+            # Commit in batches
+            if buffer and (
+                len(buffer) >= BATCH_COMMIT_SIZE
+                or time.monotonic() - last_commit >= BATCH_COMMIT_SECONDS
+            ):
+                flush_new_products(session, repo, buffer)
+                last_commit = time.monotonic()
+                logger.info("  --- Committed batch (%d/%d) ---", i, n)
+
+    flush_new_products(session, repo, buffer)
     session.commit()
     return stats
 
 
+def status_counts(session: Session) -> dict[str, int]:
+    """{verification_status: count} for the brand, aggregated in one GROUP BY."""
+    rows = session.execute(
+        select(ProductORM.verification_status, func.count())
+        .where(ProductORM.brand_slug == BRAND)
+        .group_by(ProductORM.verification_status)
+    ).all()
+    return dict(rows)
+
+
 def update_coverage(session: Session):
     """Phase 3: Update brand coverage stats."""
-    products = session.query(ProductORM).filter(ProductORM.brand_slug == BRAND).all()
-    total = len(products)
-    verified = sum(1 for p in products if p.verification_status == "verified_inci")
-    catalog = sum(1 for p in products if p.verification_status == "catalog_only")
-    quarantined = sum(1 for p in products if p.verification_status == "quarantined")
+    counts = status_counts(session)
+    total = sum(counts.values())
+    verified = counts.get("verified_inci", 0)
+    catalog = counts.get("catalog_only", 0)
+    quarantined = counts.get("quarantined", 0)
     rate = verified / total if total > 0 else 0.0
 
     coverage = (
@@ -268,8 +445,8 @@ def update_coverage(session: Session):
 
     session.commit()
     logger.info(
-        f"Coverage updated: {total} total, {verified} verified ({rate:.1%}), "
-        f"{catalog} catalog, {quarantined} quarantined"
+        "Coverage updated: %d total, %d verified (%.1f%%), %d catalog, %d quarantined",
+        total, verified, rate * 100, catalog, quarantined,
     )
 
 
@@ -285,9 +462,9 @@ def main():
 
     all_urls = discover_all_urls()
     individual, kits = classify_urls(all_urls)
-    logger.info(f"\nDiscovered {len(all_urls)} total URLs:")
-    logger.info(f"  Individual products: {len(individual)}")
-    logger.info(f"  Kits:                {len(kits)}")
+    logger.info("\nDiscovered %d total URLs:", len(all_urls))
+    logger.info("  Individual products: %d", len(individual))
+    logger.info("  Kits:                %d", len(kits))
 
     # Save URL list for reference
     os.makedirs("data", exist_ok=True)
@@ -301,7 +478,7 @@ def main():
         f.write(f"\n# === KITS ({len(kits)}) ===\n")
         for url in kits:
             f.write(url + "\n")
-    logger.info(f"Saved URL list to {url_file}")
+    logger.info("Saved URL list to %s", url_file)
 
     if args.discover_only:
         logger.info("--discover-only: stopping here.")
@@ -310,44 +487,41 @@ def main():
     # ── Phase 2: Extract ──
     engine = get_engine()
     with Session(engine) as session:
+        # upsert_product matches on product_url, so check exactly the discovered URLs
         existing_urls = set(
-            r[0]
-            for r in session.query(ProductORM.product_url)
-            .filter(ProductORM.brand_slug == BRAND)
-            .all()
+            session.execute(
+                select(ProductORM.product_url).where(ProductORM.product_url.in_(all_urls))
+            ).scalars()
         )
         new_urls = sorted(all_urls - existing_urls)
 
-        logger.info(f"\n{'=' * 60}")
-        logger.info(f"PHASE 2: Extracting {len(new_urls)} new products ({len(existing_urls)} already in DB)...")
-        logger.info(f"{'=' * 60}")
+        logger.info("\n%s", "=" * 60)
+        logger.info("PHASE 2: Extracting %d new products (%d already in DB)...", len(new_urls), len(existing_urls))
+        logger.info("=" * 60)
 
         if not new_urls:
             logger.info("Nothing new to extract!")
         else:
-            browser = BrowserClient(headless=True, delay_seconds=1.5)
+            browser = BrowserClient(headless=True, delay_seconds=1.5, settle_ms=500)
             try:
                 stats = extract_products(new_urls, session, browser)
-                logger.info(f"\nExtraction results: {stats}")
+                logger.info("\nExtraction results: %s", stats)
             finally:
                 browser.close()
 
         # ── Phase 3: Coverage ──
-        logger.info(f"\n{'=' * 60}")
+        logger.info("\n%s", "=" * 60)
         logger.info("PHASE 3: Updating coverage stats...")
-        logger.info(f"{'=' * 60}")
+        logger.info("=" * 60)
         update_coverage(session)
 
         # Final summary
-        final = session.query(ProductORM).filter(ProductORM.brand_slug == BRAND).count()
-        verified = (
-            session.query(ProductORM)
-            .filter(ProductORM.brand_slug == BRAND, ProductORM.verification_status == "verified_inci")
-            .count()
-        )
-        logger.info(f"\n{'=' * 60}")
-        logger.info(f"FINAL: {final} products total, {verified} verified INCI")
-        logger.info(f"{'=' * 60}")
+        counts = status_counts(session)
+        final = sum(counts.values())
+        verified = counts.get("verified_inci", 0)
+        logger.info("\n%s", "=" * 60)
+        logger.info("FINAL: %d products total, %d verified INCI", final, verified)
+        logger.info("=" * 60)
 
 
 if __name__ == "__main__":
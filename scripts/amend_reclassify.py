@@ -1,6 +1,8 @@
 """Reclassify all Amend products: is_kit, product_type_normalized, product_category."""
 from __future__ import annotations
 
+import re
+
 from sqlalchemy import create_engine
 from sqlalchemy.orm import Session
 
@@ -13,11 +15,11 @@ KIT_NAME_PATTERNS = [
     "kit ", "kit-", " | 2 produtos", " | 3 produtos", " | 4 produtos",
     " | 5 produtos", " | 6 produtos",
 ]
+_KIT_NAME_RE = re.compile("|".join(map(re.escape, KIT_NAME_PATTERNS)), re.IGNORECASE)
 
 
 def is_kit_by_name(name: str) -> bool:
-    lower = name.lower()
-    return any(p in lower for p in KIT_NAME_PATTERNS)
+    return _KIT_NAME_RE.search(name) is not None
 
 
 def main() -> None:
@@ -12,7 +12,8 @@ from __future__ import annotations
 import os
 import sys
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import Session
 
 # Add project root to path
@@ -20,6 +21,39 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from src.storage.orm_models import Base, ProductORM, ProductEvidenceORM, QuarantineDetailORM, BrandCoverageORM
 
+BATCH_SIZE = 1000
+
+
+def _upsert_batch(dst: Session, table, pk_cols: list[str], batch: list[dict]) -> None:
+    """Upsert one batch with a single INSERT ... ON CONFLICT.
+
+    Same semantics as ``dst.merge()`` per row (insert, or overwrite on primary
+    key match) without the per-row SELECT round-trip.
+    """
+    stmt = pg_insert(table).values(batch)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=pk_cols,
+        set_={c.name: stmt.excluded[c.name] for c in table.columns if c.name not in pk_cols},
+    )
+    dst.execute(stmt)
+
+
+def _export_table(src: Session, dst: Session, model, label: str) -> None:
+    """Stream ``model`` rows from source to target in BATCH_SIZE chunks.
+
+    Source rows are read as plain table rows with ``yield_per`` so peak memory
+    is one batch, not the whole table, and the target starts receiving rows
+    while the source is still being scanned.
+    """
+    table = model.__table__
+    pk_cols = [c.name for c in table.primary_key.columns]
+    total = src.scalar(select(func.count()).select_from(table))
+    print(f"Exporting {total} {label}...")
+
+    result = src.execute(select(table), execution_options={"yield_per": BATCH_SIZE})
+    for partition in result.mappings().partitions():
+        _upsert_batch(dst, table, pk_cols, [dict(row) for row in partition])
+
 
 def main():
     target_url = os.environ.get("DATABASE_URL")
@@ -39,36 +73,11 @@ def main():
     Base.metadata.create_all(target)
 
     with Session(source) as src, Session(target) as dst:
-        # Products
-        products = src.query(ProductORM).all()
-        print(f"Exporting {len(products)} products...")
-        for p in products:
-            data = {c.name: getattr(p, c.name) for c in ProductORM.__table__.columns}
-            dst.merge(ProductORM(**data))
-        dst.flush()
-
-        # Evidence
-        evidence = src.query(ProductEvidenceORM).all()
-        print(f"Exporting {len(evidence)} evidence records...")
-        for e in evidence:
-            data = {c.name: getattr(e, c.name) for c in ProductEvidenceORM.__table__.columns}
-            dst.merge(ProductEvidenceORM(**data))
-        dst.flush()
-
-        # Quarantine
-        quarantine = src.query(QuarantineDetailORM).all()
-        print(f"Exporting {len(quarantine)} quarantine records...")
-        for q in quarantine:
-            data = {c.name: getattr(q, c.name) for c in QuarantineDetailORM.__table__.columns}
-            dst.merge(QuarantineDetailORM(**data))
-        dst.flush()
-
-        # Brand coverage
-        coverages = src.query(BrandCoverageORM).all()
-        print(f"Exporting {len(coverages)} brand coverage records...")
-        for c_item in coverages:
-            data = {c.name: getattr(c_item, c.name) for c in BrandCoverageORM.__table__.columns}
-            dst.merge(BrandCoverageORM(**data))
+        # Parents before children (evidence/quarantine FK to products)
+        _export_table(src, dst, ProductORM, "products")
+        _export_table(src, dst, ProductEvidenceORM, "evidence records")
+        _export_table(src, dst, QuarantineDetailORM, "quarantine records")
+        _export_table(src, dst, BrandCoverageORM, "brand coverage records")
 
         dst.commit()
         print("Done!")
@@ -132,7 +132,7 @@ def extract_product(html: str, url: str) -> ProductExtraction | None:
         product_name=name,
         product_url=url,
         image_url_main=image,
-        gender_target=GenderTarget(gender) if gender in [e.value for e in GenderTarget] else GenderTarget.UNKNOWN,
+        gender_target=GenderTarget.coerce(gender),
         product_type_raw=product_type,
         product_type_normalized=product_type,
         product_category=category,
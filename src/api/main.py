@@ -1,7 +1,7 @@
 # src/api/main.py
 from __future__ import annotations
 
-import collections
+import hashlib
 import logging
 import os
 import time
@@ -9,9 +9,12 @@ from pathlib import Path
 
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import FileResponse, JSONResponse, Response
 from fastapi.staticfiles import StaticFiles
+from starlette.datastructures import Headers, MutableHeaders
 
+from src.api.responses import ORJSONResponse
 from src.api.routes.products import router as products_router
 from src.api.routes.brands import router as brands_router
 from src.api.routes.quarantine import router as quarantine_router
@@ -31,14 +34,148 @@ from src.api.routes.moon import router as moon_router
 
 logger = logging.getLogger("haira.api")
 
-# ── Rate limiter (in-memory, per-IP) ──
+
+# ── Rate limiter (per-IP; shared via Redis when REDIS_URL is set) ──
 
 _RATE_WINDOW = 60  # seconds
 _RATE_LIMIT = int(os.environ.get("API_RATE_LIMIT", "120"))  # requests per window
 
-_request_log: dict[str, collections.deque] = {}
+_RATE_MAX_CLIENTS = int(os.environ.get("API_RATE_LIMIT_IPS", "100000"))
+
+# Token bucket per client IP: (tokens left, last refill). Refills continuously at
+# _RATE_LIMIT tokens per _RATE_WINDOW, so each request is O(1) arithmetic.
+# Kept in LRU order (pop + reinsert on every hit) and capped at
+# _RATE_MAX_CLIENTS; an evicted client just starts again with a full bucket.
+_buckets: dict[str, tuple[float, float]] = {}
+
+# With several uvicorn workers each process keeps its own buckets, so the
+# effective limit is workers × API_RATE_LIMIT. REDIS_URL switches to one
+# fixed-window counter per IP shared by all workers (optional `redis` extra).
+_redis = None
+_REDIS_URL = os.environ.get("REDIS_URL", "").strip()
+if _REDIS_URL:
+    try:
+        import redis.asyncio as aioredis
+
+        _redis = aioredis.from_url(_REDIS_URL)
+    except ImportError:
+        logger.warning("REDIS_URL set but the redis package is not installed — rate limit stays per-process")
+
+# After a Redis failure, skip it for this long (local buckets meanwhile): one
+# connect attempt and one WARNING per window instead of one per request.
+_REDIS_RETRY_AFTER = 30.0  # seconds
+_redis_down_until = 0.0  # time.monotonic()
+
+
+def _local_over_limit(client_ip: str) -> bool:
+    """Token-bucket check against this process's buckets."""
+    now = time.monotonic()
+    tokens, last = _buckets.pop(client_ip, None) or (_RATE_LIMIT, now)
+    tokens = min(_RATE_LIMIT, tokens + (now - last) * _RATE_LIMIT / _RATE_WINDOW)
+    if tokens < 1:
+        _buckets[client_ip] = (tokens, now)
+        return True
+    _buckets[client_ip] = (tokens - 1, now)
+    if len(_buckets) > _RATE_MAX_CLIENTS:
+        del _buckets[next(iter(_buckets))]
+    return False
+
+
+async def _redis_over_limit(client_ip: str) -> bool:
+    """Fixed-window counter in Redis: INCR + EXPIRE in one pipelined round-trip.
+
+    The window index uses wall-clock time because it must agree across
+    processes (monotonic clocks are per-process).
+    """
+    key = f"rl:{client_ip}:{int(time.time() // _RATE_WINDOW)}"
+    async with _redis.pipeline(transaction=False) as pipe:
+        pipe.incr(key)
+        pipe.expire(key, _RATE_WINDOW)
+        count, _ = await pipe.execute()
+    return count > _RATE_LIMIT
+
+app = FastAPI(
+    title="HAIRA v2",
+    version="2.0.0",
+    description="Hair Product Intelligence Platform API",
+    default_response_class=ORJSONResponse,
+)
+
+# Streaming downloads are not buffered for hashing
+_ETAG_SKIP_PREFIXES = ("/api/products/export",)
+
 
-app = FastAPI(title="HAIRA v2", version="2.0.0", description="Hair Product Intelligence Platform API")
+class _ETagMiddleware:
+    """ETag + If-None-Match para GETs da API.
+
+    Hash do corpo da resposta; se o cliente já tem a mesma versão, devolve
+    304 sem corpo (nada de serializar no wire nem parse no cliente). ASGI puro
+    e logo acima do router: o hash cobre o corpo *sem* compressão (o gzip do
+    Starlette grava o mtime no header, então bytes comprimidos mudam a cada
+    segundo) e a resposta segue adiante numa única mensagem de body.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        path = scope.get("path", "")
+        if (
+            scope["type"] != "http"
+            or scope["method"] != "GET"
+            or not path.startswith("/api/")
+            or path.startswith(_ETAG_SKIP_PREFIXES)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        chunks: list[bytes] = []
+
+        async def buffer_send(message):
+            nonlocal start_message
+            if start_message is None:
+                start_message = message
+                if message["status"] != 200:
+                    await send(message)
+                return
+            if start_message["status"] != 200:
+                await send(message)
+                return
+            chunks.append(message.get("body", b""))
+            if message.get("more_body", False):
+                return
+
+            body = b"".join(chunks)
+            # Weak: gzip and identity share the tag, and RFC 9110 forbids a
+            # strong validator across content-codings. If-None-Match uses the
+            # weak comparison anyway.
+            opaque = f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+            tag = f"W/{opaque}"
+            if_none_match = Headers(scope=scope).get("if-none-match")
+            if if_none_match and (
+                if_none_match.strip() == "*"
+                or opaque in (t.strip().removeprefix("W/") for t in if_none_match.split(","))
+            ):
+                await send({"type": "http.response.start", "status": 304, "headers": [(b"etag", tag.encode())]})
+                await send({"type": "http.response.body", "body": b""})
+                return
+            headers = MutableHeaders(raw=list(start_message["headers"]))
+            headers["ETag"] = tag
+            headers["Content-Length"] = str(len(body))
+            await send({**start_message, "headers": headers.raw})
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, buffer_send)
+
+
+# Ordem importa: add_middleware empilha de fora para dentro a partir do último
+# registrado. ETag fica no nível mais interno (hash do corpo sem compressão,
+# igual com ou sem Accept-Encoding) e GZip logo acima dele, vendo mensagens
+# de body únicas — minimum_size funciona e respostas pequenas não comprimem.
+app.add_middleware(_ETagMiddleware)
+# Compressão — JSON das listagens encolhe 5-10x.
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
 
 # Origin whitelisting — em prod, set ALLOWED_ORIGINS=https://haira-app-production-deb8.up.railway.app
 # (vírgulas pra múltiplos). Default no Railway hoje cobre o domínio público + dev local.
@@ -76,39 +213,61 @@ async def security_headers(request: Request, call_next):
     return response
 
 
-@app.middleware("http")
-async def rate_limit(request: Request, call_next):
-    if request.url.path.startswith("/api/"):
-        client_ip = request.client.host if request.client else "unknown"
-        now = time.time()
-        if client_ip not in _request_log:
-            _request_log[client_ip] = collections.deque()
-        dq = _request_log[client_ip]
-        # Purge entries older than the window
-        while dq and dq[0] < now - _RATE_WINDOW:
-            dq.popleft()
-        if len(dq) >= _RATE_LIMIT:
-            return JSONResponse(
+class _RateLimitAndLogMiddleware:
+    """Rate limit /api/* and log every request, as one pure-ASGI middleware.
+
+    Replaces two ``@app.middleware("http")`` layers: BaseHTTPMiddleware bridges
+    each response through an extra task and memory stream, while this only
+    wraps ``send`` to capture the status code.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        handler = self.app
+        if scope["path"].startswith("/api/") and await self._over_limit(scope):
+            handler = JSONResponse(
                 status_code=429,
                 content={"detail": "Too many requests. Try again later."},
             )
-        dq.append(now)
-    return await call_next(request)
-
-
-@app.middleware("http")
-async def log_requests(request: Request, call_next):
-    start = time.perf_counter()
-    response = await call_next(request)
-    duration_ms = (time.perf_counter() - start) * 1000
-    logger.info(
-        "%s %s %s %.0fms",
-        request.method,
-        request.url.path,
-        response.status_code,
-        duration_ms,
-    )
-    return response
+        try:
+            await handler(scope, receive, send_with_status)
+        finally:
+            duration_ms = (time.perf_counter() - start) * 1000
+            logger.info("%s %s %s %.0fms", scope["method"], scope["path"], status_code, duration_ms)
+
+    @staticmethod
+    async def _over_limit(scope) -> bool:
+        client = scope.get("client")
+        client_ip = client[0] if client else "unknown"
+        global _redis_down_until
+        if _redis is not None and time.monotonic() >= _redis_down_until:
+            try:
+                return await _redis_over_limit(client_ip)
+            except Exception as exc:  # noqa: BLE001 — Redis down: degrade to per-process limiting
+                _redis_down_until = time.monotonic() + _REDIS_RETRY_AFTER
+                logger.warning(
+                    "Redis rate limit unavailable (%s) — using local buckets for %.0fs",
+                    exc, _REDIS_RETRY_AFTER,
+                )
+        return _local_over_limit(client_ip)
+
+
+app.add_middleware(_RateLimitAndLogMiddleware)
 
 app.include_router(products_router, prefix="/api")
 app.include_router(brands_router, prefix="/api")
@@ -207,9 +366,14 @@ def _init_databases() -> None:
         logger.info("DB mode: single-db (DATABASE_URL only)")
 
 
+_HEALTH_BODY = b'{"status":"ok"}'
+
+
 @app.get("/health")
-def health():
-    return {"status": "ok"}
+async def health():
+    # Liveness probe: constant body, no serialization; async so it doesn't
+    # take a threadpool slot
+    return Response(content=_HEALTH_BODY, media_type="application/json")
 
 
 @app.get("/api/admin/dbs/status")
@@ -255,9 +419,35 @@ _FRONTEND_DIST_CANDIDATES = [
 ]
 _FRONTEND_DIST = next((p for p in _FRONTEND_DIST_CANDIDATES if p.is_dir()), _FRONTEND_DIST_CANDIDATES[0])
 
+
+class _ImmutableStaticFiles(StaticFiles):
+    """StaticFiles for Vite's content-hashed bundles: a filename never changes
+    content, so browsers may cache it forever."""
+
+    async def get_response(self, path: str, scope):
+        response = await super().get_response(path, scope)
+        if response.status_code in (200, 304):
+            response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+        return response
+
+
 if _FRONTEND_DIST.is_dir():
     # Serve Vite-built assets (JS, CSS, images)
-    app.mount("/assets", StaticFiles(directory=_FRONTEND_DIST / "assets"), name="assets")
+    app.mount("/assets", _ImmutableStaticFiles(directory=_FRONTEND_DIST / "assets"), name="assets")
+
+    # index.html is tiny and only changes on deploy: read it once instead of
+    # stat/open/read on every SPA navigation
+    _INDEX_HTML = (_FRONTEND_DIST / "index.html").read_bytes()
+    _INDEX_ETAG = f'"{hashlib.blake2b(_INDEX_HTML, digest_size=16).hexdigest()}"'
+    _INDEX_HEADERS = {"ETag": _INDEX_ETAG, "Cache-Control": "no-cache"}
+
+    # Other files Vite copies from public/ (favicon, robots.txt, ...), snapshotted
+    # once: the dist dir is immutable per deploy, so a dict lookup replaces a stat
+    _DIST_FILES = {
+        "/" + f.relative_to(_FRONTEND_DIST).as_posix(): f
+        for f in _FRONTEND_DIST.rglob("*")
+        if f.is_file() and f.name != "index.html" and f.relative_to(_FRONTEND_DIST).parts[0] != "assets"
+    }
 
     # SPA fallback via middleware — avoids catch-all route that causes 405 on API POST routes
     @app.middleware("http")
@@ -269,5 +459,10 @@ if _FRONTEND_DIST.is_dir():
             and request.method == "GET"
             and not request.url.path.startswith(("/api/", "/health", "/assets/", "/openapi", "/docs", "/redoc"))
         ):
-            return FileResponse(_FRONTEND_DIST / "index.html")
+            static_file = _DIST_FILES.get(request.url.path)
+            if static_file is not None:
+                return FileResponse(static_file)
+            if request.headers.get("if-none-match") == _INDEX_ETAG:
+                return Response(status_code=304, headers=_INDEX_HEADERS)
+            return Response(content=_INDEX_HTML, media_type="text/html", headers=_INDEX_HEADERS)
         return response
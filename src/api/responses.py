@@ -0,0 +1,21 @@
+# src/api/responses.py
+from __future__ import annotations
+
+import orjson
+from fastapi.responses import JSONResponse
+
+
+class ORJSONResponse(JSONResponse):
+    """JSONResponse rendered by orjson (C encoder, emits bytes directly).
+
+    Used as the app's default_response_class. Row-heavy handlers also return
+    it directly: a Response instance skips FastAPI's jsonable_encoder pass,
+    which walks every value of every row before encoding. Only do that when
+    the payload is already plain JSON types (str/int/float/bool/None/list/dict).
+
+    fastapi.responses.ORJSONResponse does the same but is deprecated in
+    recent FastAPI releases.
+    """
+
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
@@ -10,7 +10,7 @@ from sqlalchemy import func, case, text
 from sqlalchemy.orm import Session as SASession
 
 from src.api.dependencies import get_brand_db_from_path, get_router, is_multi_db
-from src.storage.database import get_engine
+from src.storage.database import open_request_session
 from src.storage.orm_models import ProductORM, ProductIngredientORM
 from src.storage.repository import ProductRepository
 
@@ -20,14 +20,11 @@ router = APIRouter(tags=["brands"])
 
 
 def _get_session():
-    from src.api.dependencies import is_multi_db
     if is_multi_db():
         # In multi-DB mode, brand list comes from central DB; no default session needed
         yield None
     else:
-        from sqlalchemy.orm import Session as SASession
-        engine = get_engine()
-        with SASession(engine) as session:
+        with open_request_session() as session:
             yield session
 
 
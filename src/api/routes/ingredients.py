@@ -4,7 +4,8 @@ from __future__ import annotations
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 
-from src.storage.database import get_engine
+from src.api.dependencies import get_router, is_multi_db
+from src.storage.database import open_request_session
 from src.storage.repository import ProductRepository
 from src.storage.orm_models import IngredientORM, ProductIngredientORM
 
@@ -12,7 +13,6 @@ router = APIRouter(tags=["ingredients"])
 
 
 def _get_session(brand: str | None = Query(None)):
-    from src.api.dependencies import is_multi_db, get_router
     if is_multi_db():
         if not brand:
             raise HTTPException(status_code=400, detail="brand query parameter required in multi-database mode")
@@ -23,9 +23,7 @@ def _get_session(brand: str | None = Query(None)):
         finally:
             session.close()
     else:
-        from sqlalchemy.orm import Session as SASession
-        engine = get_engine()
-        with SASession(engine) as session:
+        with open_request_session() as session:
             yield session
 
 
@@ -3,16 +3,23 @@ from __future__ import annotations
 
 import csv
 import io
+import threading
+from collections.abc import Iterable, Iterator
 from datetime import datetime, timezone
+from itertools import islice
+from operator import attrgetter
 from typing import Optional
 
+import orjson
 from fastapi import APIRouter, Depends, HTTPException, Query
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
 
+from src.api.dependencies import get_router, is_multi_db
+from src.api.responses import ORJSONResponse
 from src.core.field_validator import validate_product_fields
-from src.storage.database import get_engine
+from src.storage.database import open_request_session
 from src.storage.orm_models import Base, ProductORM, ProductEvidenceORM
 from src.storage.repository import ProductRepository
 
@@ -22,8 +29,24 @@ def _is_kit(p: ProductORM) -> bool:
     return bool(p.is_kit)
 
 
+# Validation reports keyed by (id, updated_at): any write bumps updated_at, so a
+# changed product simply misses. Oldest entries are dropped past the cap.
+# Sync routes run in the threadpool: insert + eviction happen under the lock.
+_VALIDATION_CACHE: dict[tuple, dict] = {}
+_VALIDATION_CACHE_MAX = 50_000
+_VALIDATION_CACHE_LOCK = threading.Lock()
+
+
 def _validate_product(p: ProductORM) -> dict:
-    """Run field cross-validation on a product and return the report dict."""
+    """Run field cross-validation on a product and return the report dict.
+
+    The report is cached per product version and shared between responses,
+    so callers must not mutate it.
+    """
+    key = (p.id, p.updated_at)
+    cached = _VALIDATION_CACHE.get(key)
+    if cached is not None:
+        return cached
     report = validate_product_fields(
         product_name=p.product_name,
         inci_ingredients=p.inci_ingredients,
@@ -34,8 +57,12 @@ def _validate_product(p: ProductORM) -> dict:
         currency=p.currency,
         image_url_main=p.image_url_main,
         product_type_normalized=p.product_type_normalized,
-    )
-    return report.to_dict()
+    ).to_dict()
+    with _VALIDATION_CACHE_LOCK:
+        _VALIDATION_CACHE[key] = report
+        if len(_VALIDATION_CACHE) > _VALIDATION_CACHE_MAX:
+            del _VALIDATION_CACHE[next(iter(_VALIDATION_CACHE))]
+    return report
 
 router = APIRouter(tags=["products"])
 
@@ -56,8 +83,12 @@ class ProductUpdate(BaseModel):
     verification_status: Optional[str] = None
     product_labels: Optional[dict] = None
 
+
+# Fields a PATCH may write: declared on ProductUpdate and backed by a column
+_UPDATABLE_FIELDS = frozenset(ProductUpdate.model_fields) & frozenset(ProductORM.__table__.columns.keys())
+
+
 def _get_session(brand_slug: str | None = Query(None)):
-    from src.api.dependencies import is_multi_db, get_router
     if is_multi_db():
         if not brand_slug:
             raise HTTPException(
@@ -71,9 +102,7 @@ def _get_session(brand_slug: str | None = Query(None)):
         finally:
             session.close()
     else:
-        from sqlalchemy.orm import Session as SASession
-        engine = get_engine()
-        with SASession(engine) as session:
+        with open_request_session() as session:
             yield session
 
 
@@ -124,7 +153,7 @@ def list_products(
     # Accept both ?brand= and ?brand_slug= for filtering
     effective_brand = brand_slug or brand
     repo = ProductRepository(session)
-    products = repo.get_products(
+    products, total = repo.get_products_with_count(
         brand_slug=effective_brand,
         verified_only=verified_only,
         search=search,
@@ -133,18 +162,12 @@ def list_products(
         limit=limit,
         offset=offset,
     )
-    total = repo.count_products(
-        brand_slug=effective_brand,
-        verified_only=verified_only,
-        search=search,
-        category=category,
-        exclude_kits=exclude_kits,
-    )
     status_counts = repo.count_products_by_status(
         brand_slug=effective_brand, search=search, category=category, exclude_kits=exclude_kits,
     )
     items = [_serialize_product_list_item(p) for p in products]
-    return {"items": items, "total": total, "limit": limit, "offset": offset, "status_counts": status_counts}
+    # Rows are already plain JSON types — encode directly, skipping jsonable_encoder
+    return ORJSONResponse({"items": items, "total": total, "limit": limit, "offset": offset, "status_counts": status_counts})
 
 
 _EXPORT_COLUMNS = [
@@ -154,6 +177,30 @@ _EXPORT_COLUMNS = [
     "size_volume", "price", "currency", "line_collection", "confidence",
     "extraction_method", "product_labels",
 ]
+_EXPORT_GET = attrgetter(*_EXPORT_COLUMNS)
+_EXPORT_CHUNK_ROWS = 500
+_EXPORT_MAX_ROWS = 10000
+
+
+def _iter_csv(products: Iterable[ProductORM]) -> Iterator[str]:
+    """Yield the export CSV in chunks of _EXPORT_CHUNK_ROWS rows.
+
+    List/dict columns (INCI, claims, labels) are JSON-encoded into one cell.
+    """
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(_EXPORT_COLUMNS)
+    rows = (
+        [orjson.dumps(v).decode() if isinstance(v, (list, dict)) else v for v in _EXPORT_GET(p)]
+        for p in products
+    )
+    while chunk := list(islice(rows, _EXPORT_CHUNK_ROWS)):
+        writer.writerows(chunk)
+        yield buf.getvalue()
+        buf.seek(0)
+        buf.truncate()
+    if buf.tell():
+        yield buf.getvalue()
 
 
 @router.get("/products/export")
@@ -167,35 +214,22 @@ def export_products(
 ):
     effective_brand = brand_slug or brand
     repo = ProductRepository(session)
-    products = repo.get_products(
+    products = repo.iter_products(
         brand_slug=effective_brand,
         verified_only=verified_only,
         search=search,
-        limit=10000,
-        offset=0,
+        limit=_EXPORT_MAX_ROWS,
+        batch_size=_EXPORT_CHUNK_ROWS,
     )
 
     if format == "json":
-        items = [_serialize_product_list_item(p) for p in products]
-        return items
+        return ORJSONResponse([_serialize_product_list_item(p) for p in products])
+
+    # Rows are fetched and written one batch at a time while the response
+    # streams; the session dependency stays open until the body is sent
 
-    # CSV export
-    buf = io.StringIO()
-    writer = csv.DictWriter(buf, fieldnames=_EXPORT_COLUMNS, extrasaction="ignore")
-    writer.writeheader()
-    for p in products:
-        row = {}
-        for col in _EXPORT_COLUMNS:
-            val = getattr(p, col, None)
-            if isinstance(val, (list, dict)):
-                import json
-                val = json.dumps(val, ensure_ascii=False)
-            row[col] = val
-        writer.writerow(row)
-
-    buf.seek(0)
     return StreamingResponse(
-        buf,
+        _iter_csv(products),
         media_type="text/csv",
         headers={"Content-Disposition": "attachment; filename=products.csv"},
     )
@@ -261,7 +295,7 @@ def get_product(product_id: str, session: Session = Depends(_get_session)):
     product = repo.get_product_by_id(product_id)
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
-    return _serialize_product_detail(product)
+    return ORJSONResponse(_serialize_product_detail(product))
 
 
 @router.get("/products/{product_id}/ingredients")
@@ -311,13 +345,13 @@ def get_validation_results(product_id: str, session: Session = Depends(_get_sess
 
 @router.patch("/products/{product_id}")
 def update_product(product_id: str, body: ProductUpdate, session: Session = Depends(_get_session)):
-    product = session.query(ProductORM).filter(ProductORM.id == product_id).first()
+    product = session.get(ProductORM, product_id)
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
 
     updates = body.model_dump(exclude_unset=True)
     for field, value in updates.items():
-        if hasattr(product, field):
+        if field in _UPDATABLE_FIELDS:
             setattr(product, field, value)
     product.updated_at = datetime.now(timezone.utc)
     session.commit()
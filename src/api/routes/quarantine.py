@@ -4,9 +4,10 @@ from __future__ import annotations
 from datetime import datetime, timezone
 
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, contains_eager
 
-from src.storage.database import get_engine
+from src.api.dependencies import get_router, is_multi_db
+from src.storage.database import open_request_session
 from src.storage.orm_models import ProductORM, QuarantineDetailORM
 from src.storage.repository import ProductRepository
 
@@ -14,7 +15,6 @@ router = APIRouter(tags=["quarantine"])
 
 
 def _get_session(brand: str | None = Query(None)):
-    from src.api.dependencies import is_multi_db, get_router
     if is_multi_db():
         if brand:
             router = get_router()
@@ -27,9 +27,7 @@ def _get_session(brand: str | None = Query(None)):
             # No brand specified — yield None; route handlers aggregate across brands
             yield None
     else:
-        from sqlalchemy.orm import Session as SASession
-        engine = get_engine()
-        with SASession(engine) as session:
+        with open_request_session() as session:
             yield session
 
 
@@ -51,6 +49,7 @@ def list_quarantined(
                 q = (
                     brand_session.query(QuarantineDetailORM)
                     .join(ProductORM)
+                    .options(contains_eager(QuarantineDetailORM.product))
                     .filter(QuarantineDetailORM.review_status == review_status)
                 )
                 items = q.limit(100).all()
@@ -71,9 +70,11 @@ def list_quarantined(
                 continue
         return all_items
 
+    # Populate .product from the join itself — no lazy SELECT per row
     query = (
         session.query(QuarantineDetailORM)
         .join(ProductORM)
+        .options(contains_eager(QuarantineDetailORM.product))
         .filter(QuarantineDetailORM.review_status == review_status)
     )
     if brand_slug:
@@ -4,33 +4,59 @@ from __future__ import annotations
 import json
 import logging
 import sys
+from functools import lru_cache
 from pathlib import Path
+from typing import TYPE_CHECKING
 
 import click
+import orjson
 
-from src.core.models import Brand
+if TYPE_CHECKING:
+    # src.core.models puxa pydantic e responde por ~2/3 do cold start do CLI;
+    # importado sob demanda para `haira --help` e comandos leves.
+    from src.core.models import Brand
 
 logger = logging.getLogger("haira")
 
+_LEVELS = logging.getLevelNamesMapping()
+
 
 def _setup_logging(level: str) -> None:
+    # `haira --help` e `haira` sem argumentos saem antes do callback do grupo;
+    # `haira <subcomando> --help` ainda passa por aqui. basicConfig já é no-op
+    # quando o root tem handlers (re-entrada via CliRunner nos testes).
     logging.basicConfig(
-        level=getattr(logging, level.upper(), logging.INFO),
+        level=_LEVELS.get(level.upper(), logging.INFO),
         format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
     )
 
 
+@lru_cache(maxsize=4)
+def _parse_brands_index(path: str, mtime_ns: int) -> dict[str, dict]:
+    # mtime_ns entra só na chave do cache: um `haira registry` que regrava o
+    # arquivo invalida a entrada sem precisar de cache_clear().
+    index: dict[str, dict] = {}
+    for b in orjson.loads(Path(path).read_bytes()):
+        slug = b.get("brand_slug")
+        if slug is not None:
+            index.setdefault(slug, b)
+    return index
+
+
+def _load_brands_index(path: Path) -> dict[str, dict]:
+    """brands.json indexado por brand_slug (ordem do arquivo preservada)."""
+    return _parse_brands_index(str(path), path.stat().st_mtime_ns)
+
+
 def _load_brand_from_registry(brand_slug: str) -> Brand | None:
     """Load a brand from config/brands.json by slug."""
+    from src.core.models import Brand
+
     path = Path("config/brands.json")
     if not path.exists():
         return None
-    with open(path) as f:
-        brands_data = json.load(f)
-    for b in brands_data:
-        if b.get("brand_slug") == brand_slug:
-            return Brand(**b)
-    return None
+    data = _load_brands_index(path).get(brand_slug)
+    return Brand(**data) if data else None
 
 
 @click.group()
@@ -174,6 +200,8 @@ def blueprint(brand: str, regenerate: bool):
 @click.option("--max-urls", type=int, default=50, help="Max URLs to discover")
 def recon(brand: str, max_urls: int):
     """Run discovery + small sample extraction for a brand."""
+    from collections import Counter
+
     from src.discovery.blueprint_engine import load_blueprint
     from src.discovery.product_discoverer import ProductDiscoverer
     from src.discovery.url_classifier import classify_url
@@ -198,12 +226,9 @@ def recon(brand: str, max_urls: int):
     click.echo(f"\nDiscovery results: {len(discovered)} URLs found")
 
     # Classify and show summary
-    type_counts: dict[str, int] = {}
-    for url_info in discovered[:max_urls]:
-        url_type = classify_url(url_info.url)
-        type_counts[url_type.value] = type_counts.get(url_type.value, 0) + 1
+    type_counts = Counter(classify_url(u.url).value for u in discovered[:max_urls])
 
-    for url_type, count in sorted(type_counts.items(), key=lambda x: -x[1]):
+    for url_type, count in type_counts.most_common():
         click.echo(f"  {url_type}: {count}")
 
     # Show sample URLs
@@ -240,11 +265,9 @@ def scrape(brand: str | None, priority: int | None, max_brands: int, headless: b
         if not path.exists():
             click.echo("config/brands.json not found. Run 'haira registry' first.", err=True)
             sys.exit(1)
-        with open(path) as f:
-            brands_data = json.load(f)
         brand_slugs = [
-            b["brand_slug"]
-            for b in brands_data
+            slug
+            for slug, b in _load_brands_index(path).items()
             if b.get("priority") is not None and b["priority"] <= priority
         ][:max_brands]
     else:
@@ -334,6 +357,8 @@ def scrape(brand: str | None, priority: int | None, max_brands: int, headless: b
 @click.option("--brand", required=True, help="Brand slug")
 def audit(brand: str):
     """Run QA audit on existing data for a brand."""
+    from collections import Counter
+
     from src.storage.database import get_engine
     from src.storage.orm_models import Base
     from src.storage.repository import ProductRepository
@@ -344,15 +369,16 @@ def audit(brand: str):
 
     with SASession(engine) as session:
         repo = ProductRepository(session)
-        products = repo.get_products(brand_slug=brand)
+        raw_counts = repo.count_verification_statuses(brand)
         coverage = repo.get_brand_coverage(brand)
 
-    if not products and not coverage:
+    total = sum(raw_counts.values())
+    if not total and not coverage:
         click.echo(f"No data found for {brand}. Run 'haira scrape --brand {brand}' first.")
         return
 
     click.echo(f"Audit for {brand}:")
-    click.echo(f"  Total products in DB: {len(products)}")
+    click.echo(f"  Total products in DB: {total}")
 
     if coverage:
         click.echo(f"  Coverage status: {coverage.status or 'unknown'}")
@@ -363,10 +389,9 @@ def audit(brand: str):
         click.echo(f"  Verification rate: {rate:.1%}")
 
     # Status breakdown
-    status_counts: dict[str, int] = {}
-    for p in products:
-        status = p.verification_status or "unknown"
-        status_counts[status] = status_counts.get(status, 0) + 1
+    status_counts: Counter[str] = Counter()
+    for status, count in raw_counts.items():
+        status_counts[status or "unknown"] += count
     if status_counts:
         click.echo(f"  Status breakdown:")
         for status, count in sorted(status_counts.items()):
@@ -457,19 +482,36 @@ def report(brand: str | None, all_brands: bool):
     """Generate coverage report."""
     from src.storage.database import get_engine
     from src.storage.orm_models import Base, BrandCoverageORM
+    from sqlalchemy import func
     from sqlalchemy.orm import Session as SASession
 
+    if brand:
+        filters = [BrandCoverageORM.brand_slug == brand]
+    elif all_brands:
+        filters = []
+    else:
+        click.echo("Specify --brand or --all-brands", err=True)
+        sys.exit(1)
+
     engine = get_engine()
     Base.metadata.create_all(engine)
 
     with SASession(engine) as session:
-        if brand:
-            coverages = session.query(BrandCoverageORM).filter_by(brand_slug=brand).all()
-        elif all_brands:
-            coverages = session.query(BrandCoverageORM).all()
-        else:
-            click.echo("Specify --brand or --all-brands", err=True)
-            sys.exit(1)
+        coverages = (
+            session.query(BrandCoverageORM)
+            .filter(*filters)
+            .order_by(BrandCoverageORM.brand_slug)
+            .all()
+        )
+        # Totais somados no banco; coalesce cobre colunas NULL e filtro vazio.
+        total_extracted, total_verified = (
+            session.query(
+                func.coalesce(func.sum(BrandCoverageORM.extracted_total), 0),
+                func.coalesce(func.sum(BrandCoverageORM.verified_inci_total), 0),
+            )
+            .filter(*filters)
+            .one()
+        )
 
     if not coverages:
         click.echo("No coverage data found.")
@@ -478,18 +520,13 @@ def report(brand: str | None, all_brands: bool):
     click.echo(f"\n{'Brand':<30} {'Status':<10} {'Disc':>6} {'Extr':>6} {'Verif':>6} {'Rate':>8}")
     click.echo("-" * 72)
 
-    total_extracted = 0
-    total_verified = 0
-
-    for c in sorted(coverages, key=lambda x: x.brand_slug):
+    for c in coverages:
         rate = c.verified_inci_rate or 0
         click.echo(
             f"{c.brand_slug:<30} {c.status or '':<10} "
             f"{c.discovered_total or 0:>6} {c.extracted_total or 0:>6} "
             f"{c.verified_inci_total or 0:>6} {rate:>7.1%}"
         )
-        total_extracted += c.extracted_total or 0
-        total_verified += c.verified_inci_total or 0
 
     click.echo("-" * 72)
     overall_rate = total_verified / total_extracted if total_extracted > 0 else 0
@@ -500,15 +537,20 @@ def report(brand: str | None, all_brands: bool):
     )
 
 
+_LABELS_BATCH = 500
+
+
 @cli.command()
 @click.option("--brand", required=True, help="Brand slug")
 @click.option("--limit", type=int, default=0, help="Max products to process (0 = all)")
 @click.option("--dry-run", is_flag=True, help="Show results without saving to database")
 def labels(brand: str, limit: int, dry_run: bool):
     """Detect product quality seals (labels) for a brand's products."""
+    from collections import Counter
+
     from src.core.label_engine import LabelEngine
     from src.storage.database import get_engine
-    from src.storage.orm_models import Base, ProductEvidenceORM
+    from src.storage.orm_models import Base
     from src.storage.repository import ProductRepository
     from sqlalchemy.orm import Session as SASession
 
@@ -531,7 +573,11 @@ def labels(brand: str, limit: int, dry_run: bool):
         total = len(products)
         with_detected = 0
         with_inferred = 0
-        seal_counts: dict[str, int] = {}
+        seal_counts: Counter[str] = Counter()
+        # Escritas acumuladas e enviadas a cada _LABELS_BATCH produtos:
+        # O(lotes) statements em vez de um DELETE + N INSERTs por produto.
+        pending_labels: dict[str, dict] = {}
+        pending_evidence: list[dict] = []
 
         for product in products:
             result = label_engine.detect(
@@ -547,8 +593,7 @@ def labels(brand: str, limit: int, dry_run: bool):
                 with_detected += 1
             if result.inferred:
                 with_inferred += 1
-            for seal in all_seals:
-                seal_counts[seal] = seal_counts.get(seal, 0) + 1
+            seal_counts.update(all_seals)
 
             if dry_run:
                 if all_seals:
@@ -559,14 +604,9 @@ def labels(brand: str, limit: int, dry_run: bool):
                         click.echo(f"    inferred: {', '.join(result.inferred)}")
                     click.echo(f"    confidence: {result.confidence}")
             else:
-                repo.update_product_labels(product.id, result.to_dict())
-                # Delete old label evidence to avoid duplicates on re-run
-                session.query(ProductEvidenceORM).filter(
-                    ProductEvidenceORM.product_id == product.id,
-                    ProductEvidenceORM.field_name.like("label:%"),
-                ).delete(synchronize_session=False)
-                for ev in result.evidence_entries():
-                    evidence_orm = ProductEvidenceORM(
+                pending_labels[product.id] = result.to_dict()
+                pending_evidence.extend(
+                    dict(
                         product_id=product.id,
                         field_name=ev["field_name"],
                         source_url=product.product_url,
@@ -574,9 +614,14 @@ def labels(brand: str, limit: int, dry_run: bool):
                         raw_source_text=ev["raw_source_text"],
                         extraction_method=ev["extraction_method"],
                     )
-                    session.add(evidence_orm)
+                    for ev in result.evidence_entries()
+                )
+                if len(pending_labels) >= _LABELS_BATCH:
+                    repo.replace_label_results(pending_labels, pending_evidence)
+                    pending_labels, pending_evidence = {}, []
 
         if not dry_run:
+            repo.replace_label_results(pending_labels, pending_evidence)
             session.commit()
 
         click.echo(f"\n{'='*60}")
@@ -586,7 +631,7 @@ def labels(brand: str, limit: int, dry_run: bool):
         click.echo(f"With detected seals:  {with_detected} ({with_detected/total:.0%})")
         click.echo(f"With inferred seals:  {with_inferred} ({with_inferred/total:.0%})")
         click.echo(f"\nSeal distribution:")
-        for seal, count in sorted(seal_counts.items(), key=lambda x: -x[1]):
+        for seal, count in seal_counts.most_common():
             click.echo(f"  {seal:<30} {count:>4} ({count/total:.0%})")
 
         if not dry_run:
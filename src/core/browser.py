@@ -16,13 +16,17 @@ _DEFAULT_USER_AGENT = (
 
 
 class BrowserClient:
-    def __init__(self, delay_seconds: float | None = None, headless: bool = True, use_httpx: bool = False, ssl_verify: bool = True, use_curl_cffi: bool = False):
+    def __init__(self, delay_seconds: float | None = None, headless: bool = True, use_httpx: bool = False, ssl_verify: bool = True, use_curl_cffi: bool = False, settle_ms: int = 2000):
         self._delay = delay_seconds or float(os.environ.get("REQUEST_DELAY_SECONDS", "3"))
+        # Upper bound on the wait after domcontentloaded for client-side rendering
+        # (see _settle); server-rendered sites (e.g. SFCC) can use a much shorter one
+        self._settle_ms = settle_ms
         self._headless = headless
         self._use_httpx = use_httpx
         self._use_curl_cffi = use_curl_cffi
         self._ssl_verify = ssl_verify
         self._browser = None
+        self._context = None
         self._page = None
         self._httpx_client = None
         self._curl_session = None
@@ -42,12 +46,12 @@ class BrowserClient:
                 headless=self._headless,
                 args=['--disable-blink-features=AutomationControlled'],
             )
-            context = self._browser.new_context(
+            self._context = self._browser.new_context(
                 user_agent=_DEFAULT_USER_AGENT,
                 viewport={'width': 1920, 'height': 1080},
                 locale='pt-BR',
             )
-            self._page = context.new_page()
+            self._page = self._context.new_page()
             self._page.add_init_script(
                 'Object.defineProperty(navigator, "webdriver", {get: () => undefined})'
             )
@@ -101,14 +105,14 @@ class BrowserClient:
         logger.info(f"Fetching: {url}")
         try:
             self._page.goto(url, timeout=45000, wait_until="domcontentloaded")
-            self._page.wait_for_timeout(2000)
+            self._settle()
         except Exception as e:
             logger.warning(f"Navigation issue for {url}: {e}")
             # Browser may have crashed — try to recover
             self._restart_browser()
             try:
                 self._page.goto(url, timeout=45000, wait_until="domcontentloaded")
-                self._page.wait_for_timeout(2000)
+                self._settle()
             except Exception as e2:
                 logger.warning(f"Retry also failed for {url}: {e2}")
                 raise
@@ -126,6 +130,20 @@ class BrowserClient:
             self._restart_browser()
             raise
 
+    def _settle(self) -> None:
+        """Wait for client-side rendering after domcontentloaded.
+
+        Returns as soon as the network goes idle (server-rendered pages settle
+        in ~500ms); pages that keep polling hit the settle_ms cap, which is the
+        old fixed wait. Anything other than the timeout (page/target crash,
+        closed browser) propagates so fetch_page can restart and retry.
+        """
+        from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+        try:
+            self._page.wait_for_load_state("networkidle", timeout=self._settle_ms)
+        except PlaywrightTimeoutError:
+            pass
+
     def _restart_browser(self) -> None:
         """Close and restart the browser (recovers from WAF-induced crashes)."""
         logger.info("Restarting browser...")
@@ -140,6 +158,7 @@ class BrowserClient:
         except Exception:
             pass
         self._browser = None
+        self._context = None
         self._page = None
         time.sleep(2)
         self._ensure_browser()
@@ -180,7 +199,7 @@ class BrowserClient:
         self._rate_limit()
         try:
             self._page.goto(url, timeout=45000, wait_until="domcontentloaded")
-            self._page.wait_for_timeout(2000)
+            self._settle()
         except Exception as e:
             logger.warning(f"Navigation issue for {url}: {e}")
         return self._page.inner_text("body")
@@ -210,7 +229,7 @@ class BrowserClient:
             self._rate_limit()
             try:
                 self._page.goto(url, timeout=45000, wait_until="domcontentloaded")
-                self._page.wait_for_timeout(2000)
+                self._settle()
             except Exception as e:
                 logger.warning(f"Navigation issue for {url}: {e}")
                 return []
@@ -236,6 +255,7 @@ class BrowserClient:
             self._browser.close()
             self._playwright.stop()
             self._browser = None
+            self._context = None
             self._page = None
         if self._httpx_client:
             self._httpx_client.close()
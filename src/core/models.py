@@ -21,6 +21,11 @@ class GenderTarget(str, enum.Enum):
     KIDS = "kids"
     UNKNOWN = "unknown"
 
+    @classmethod
+    def coerce(cls, value: str | None) -> GenderTarget:
+        """Member for ``value``, or UNKNOWN when it isn't a valid gender value (O(1) lookup)."""
+        return cls._value2member_map_.get(value, cls.UNKNOWN)
+
 
 class AudienceAge(str, enum.Enum):
     UNDER_3 = "under_3"
@@ -161,6 +161,7 @@ KIT_PATTERNS: list[str] = [
     r"/kit[-_]", r"/combo[-_]", r"/bundle[-_]", r"/set[-_]",
     r"/kit/", r"/combo/", r"/bundle/",
 ]
+_KIT_URL_RE = re.compile("|".join(KIT_PATTERNS))
 
 MALE_TARGETING_KEYWORDS: list[str] = [
     "masculino", "masculina", "men", "for men", "man",
@@ -359,8 +360,4 @@ def is_hair_relevant_by_keywords(
 
 
 def is_kit_url(url: str) -> bool:
-    lower_url = url.lower()
-    for pattern in KIT_PATTERNS:
-        if re.search(pattern, lower_url):
-            return True
-    return False
+    return _KIT_URL_RE.search(url.lower()) is not None
@@ -5,6 +5,7 @@ import html as html_module
 import json
 import re
 import logging
+from functools import lru_cache
 
 from src.core.models import ExtractionMethod
 from src.extraction.evidence_tracker import create_evidence
@@ -26,8 +27,10 @@ def sanitize_text(text: str | None) -> str | None:
 
 try:
     from bs4 import BeautifulSoup
+    import soupsieve
 except ImportError:
     BeautifulSoup = None
+    soupsieve = None
 
 def _get_soup(html: str):
     if BeautifulSoup is None:
@@ -35,6 +38,17 @@ def _get_soup(html: str):
     return BeautifulSoup(html, "lxml")
 
 
+@lru_cache(maxsize=256)
+def _compile_selector(selector: str):
+    """Compiled CSS selector, cached per process.
+
+    soupsieve already caches its own compile(); this only skips that cache's
+    lookup (namespace/flags key) for the few blueprint selectors every page
+    of a brand reuses.
+    """
+    return soupsieve.compile(selector)
+
+
 def extract_jsonld(html: str) -> dict | None:
     soup = _get_soup(html)
     scripts = soup.find_all("script", type="application/ld+json")
@@ -275,7 +289,7 @@ def extract_by_selectors(
 
     if name_selectors:
         for sel in name_selectors:
-            el = soup.select_one(sel)
+            el = _compile_selector(sel).select_one(soup)
             if el and el.get_text(strip=True):
                 result["name"] = el.get_text(strip=True)
                 result["name_selector"] = sel
@@ -283,7 +297,7 @@ def extract_by_selectors(
 
     if inci_selectors:
         for sel in inci_selectors:
-            el = soup.select_one(sel)
+            el = _compile_selector(sel).select_one(soup)
             if el and el.get_text(strip=True):
                 result["inci_raw"] = el.get_text(strip=True)
                 result["inci_selector"] = sel
@@ -298,7 +312,7 @@ def extract_by_selectors(
 
     if image_selectors:
         for sel in image_selectors:
-            el = soup.select_one(sel)
+            el = _compile_selector(sel).select_one(soup)
             if el:
                 src = el.get("data-src") or el.get("src")
                 # Skip data URIs (lazy-loading placeholders)
@@ -311,7 +325,7 @@ def extract_by_selectors(
     # Price extraction via selectors + regex
     if price_selectors:
         for sel in price_selectors:
-            els = soup.select(sel)
+            els = _compile_selector(sel).select(soup)
             for el in els:
                 text = el.get_text(strip=True)
                 # Match Brazilian price format: R$ 1.234,56 or R$ 100,00
@@ -330,7 +344,7 @@ def extract_by_selectors(
     # Description via selectors (use first selector that returns >= 30 chars)
     if description_selectors:
         for sel in description_selectors:
-            el = soup.select_one(sel)
+            el = _compile_selector(sel).select_one(soup)
             if el:
                 # meta tag — read content attribute
                 if el.name == "meta":
@@ -318,7 +318,7 @@ Product: {product_name}
             product_name=product_name,
             product_url=url,
             image_url_main=det_result.get("image_url_main"),
-            gender_target=GenderTarget(gender) if gender in [e.value for e in GenderTarget] else GenderTarget.UNKNOWN,
+            gender_target=GenderTarget.coerce(gender),
             hair_relevance_reason=reason or "product_url",
             product_type_raw=product_name,
             product_type_normalized=product_type,
@@ -8,6 +8,7 @@ from sqlalchemy.orm import Session, sessionmaker
 
 _engine: Engine | None = None
 _core_engine: Engine | None = None
+_request_session_factory: sessionmaker | None = None
 
 
 def _build_engine(url: str) -> Engine:
@@ -16,8 +17,13 @@ def _build_engine(url: str) -> Engine:
         url = url.replace("postgres://", "postgresql://", 1)
     kwargs: dict = {"echo": os.environ.get("SQL_ECHO", "").lower() == "true"}
     if url.startswith("postgresql"):
+        # Same pool policy as the API's per-role engines (main._make_engine):
+        # recycle before Railway's proxy drops idle connections, so pre_ping
+        # rarely has to reconnect on the request path
         kwargs["pool_size"] = 5
+        kwargs["max_overflow"] = 5
         kwargs["pool_pre_ping"] = True
+        kwargs["pool_recycle"] = 300
     return create_engine(url, **kwargs)
 
 
@@ -69,7 +75,21 @@ def get_session() -> Session:
     return factory()
 
 
+def open_request_session() -> Session:
+    """Session on ``get_engine()`` for the API's per-route ``_get_session`` deps.
+
+    The sessionmaker is built once. ``expire_on_commit=False`` because a request
+    session ends right after its commit — expiring would only force a reload
+    SELECT when the handler serializes the row it just wrote.
+    """
+    global _request_session_factory
+    if _request_session_factory is None:
+        _request_session_factory = sessionmaker(bind=get_engine(), expire_on_commit=False)
+    return _request_session_factory()
+
+
 def reset_engine() -> None:
-    global _engine, _core_engine
+    global _engine, _core_engine, _request_session_factory
     _engine = None
     _core_engine = None
+    _request_session_factory = None
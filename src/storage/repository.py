@@ -2,11 +2,13 @@
 from __future__ import annotations
 
 import logging
+import uuid
+from collections.abc import Iterator
 from datetime import datetime, timezone
 
 logger = logging.getLogger("haira.repository")
 
-from sqlalchemy import String, cast, func, or_
+from sqlalchemy import String, cast, delete, func, insert, or_, update
 from sqlalchemy.orm import Session
 
 from src.core.models import ProductExtraction, QAResult, QAStatus
@@ -102,50 +104,14 @@ class ProductRepository:
                 existing.extraction_method = extraction.extraction_method
             product_id = existing.id
         else:
-            product = ProductORM(
-                brand_slug=extraction.brand_slug,
-                product_name=extraction.product_name,
-                product_url=extraction.product_url,
-                image_url_main=extraction.image_url_main,
-                image_urls_gallery=extraction.image_urls_gallery or None,
-                verification_status=qa.status.value,
-                product_type_raw=extraction.product_type_raw,
-                product_type_normalized=extraction.product_type_normalized,
-                product_category=extraction.product_category,
-                gender_target=extraction.gender_target.value,
-                hair_relevance_reason=extraction.hair_relevance_reason,
-                inci_ingredients=extraction.inci_ingredients,
-                description=extraction.description,
-                usage_instructions=extraction.usage_instructions,
-                composition=extraction.composition,
-                care_usage=extraction.care_usage,
-                benefits_claims=extraction.benefits_claims,
-                size_volume=extraction.size_volume,
-                price=extraction.price,
-                currency=extraction.currency,
-                line_collection=extraction.line_collection,
-                variants=extraction.variants,
-                confidence=extraction.confidence,
-                extraction_method=extraction.extraction_method,
-                extracted_at=extraction.extracted_at,
-            )
+            product = ProductORM(**self._new_product_values(extraction, qa))
             self._session.add(product)
             self._session.flush()
             product_id = product.id
 
         # Save evidence
         for ev in extraction.evidence:
-            evidence_orm = ProductEvidenceORM(
-                product_id=product_id,
-                field_name=ev.field_name,
-                source_url=ev.source_url,
-                evidence_locator=ev.evidence_locator,
-                raw_source_text=ev.raw_source_text,
-                extraction_method=ev.extraction_method.value,
-                source_section_label=ev.source_section_label,
-                extracted_at=ev.extracted_at,
-            )
-            self._session.add(evidence_orm)
+            self._session.add(ProductEvidenceORM(**self._evidence_values(product_id, ev)))
 
         # Save quarantine details
         if qa.status == QAStatus.QUARANTINED and qa.rejection_reason:
@@ -157,15 +123,86 @@ class ProductRepository:
             if existing_q:
                 existing_q.rejection_reason = qa.rejection_reason
             else:
-                qd = QuarantineDetailORM(
-                    product_id=product_id,
-                    rejection_reason=qa.rejection_reason,
-                    rejection_code=qa.checks_failed[0] if qa.checks_failed else None,
-                )
-                self._session.add(qd)
+                self._session.add(QuarantineDetailORM(**self._quarantine_values(product_id, qa)))
 
         return product_id
 
+    @staticmethod
+    def _new_product_values(extraction: ProductExtraction, qa: QAResult) -> dict:
+        return dict(
+            brand_slug=extraction.brand_slug,
+            product_name=extraction.product_name,
+            product_url=extraction.product_url,
+            image_url_main=extraction.image_url_main,
+            image_urls_gallery=extraction.image_urls_gallery or None,
+            verification_status=qa.status.value,
+            product_type_raw=extraction.product_type_raw,
+            product_type_normalized=extraction.product_type_normalized,
+            product_category=extraction.product_category,
+            gender_target=extraction.gender_target.value,
+            hair_relevance_reason=extraction.hair_relevance_reason,
+            inci_ingredients=extraction.inci_ingredients,
+            description=extraction.description,
+            usage_instructions=extraction.usage_instructions,
+            composition=extraction.composition,
+            care_usage=extraction.care_usage,
+            benefits_claims=extraction.benefits_claims,
+            size_volume=extraction.size_volume,
+            price=extraction.price,
+            currency=extraction.currency,
+            line_collection=extraction.line_collection,
+            variants=extraction.variants,
+            confidence=extraction.confidence,
+            extraction_method=extraction.extraction_method,
+            extracted_at=extraction.extracted_at,
+        )
+
+    @staticmethod
+    def _evidence_values(product_id: str, ev) -> dict:
+        return dict(
+            product_id=product_id,
+            field_name=ev.field_name,
+            source_url=ev.source_url,
+            evidence_locator=ev.evidence_locator,
+            raw_source_text=ev.raw_source_text,
+            extraction_method=ev.extraction_method.value,
+            source_section_label=ev.source_section_label,
+            extracted_at=ev.extracted_at,
+        )
+
+    @staticmethod
+    def _quarantine_values(product_id: str, qa: QAResult) -> dict:
+        return dict(
+            product_id=product_id,
+            rejection_reason=qa.rejection_reason,
+            rejection_code=qa.checks_failed[0] if qa.checks_failed else None,
+        )
+
+    def insert_new_products(self, items: list[tuple[ProductExtraction, QAResult]]) -> list[str]:
+        """Bulk-insert products whose URLs are known NOT to be in the DB yet.
+
+        Core executemany for products, evidence and quarantine rows — no ORM
+        objects or identity-map bookkeeping. Unlike upsert_product there is no
+        merge with an existing row (and so no re-scrape protection), so callers
+        must have already excluded existing URLs. Returns the new product ids.
+        """
+        if not items:
+            return []
+        product_rows, evidence_rows, quarantine_rows = [], [], []
+        for extraction, qa in items:
+            product_id = str(uuid.uuid4())
+            product_rows.append({"id": product_id, **self._new_product_values(extraction, qa)})
+            evidence_rows.extend(self._evidence_values(product_id, ev) for ev in extraction.evidence)
+            if qa.status == QAStatus.QUARANTINED and qa.rejection_reason:
+                quarantine_rows.append(self._quarantine_values(product_id, qa))
+
+        self._session.execute(insert(ProductORM.__table__), product_rows)
+        if evidence_rows:
+            self._session.execute(insert(ProductEvidenceORM.__table__), evidence_rows)
+        if quarantine_rows:
+            self._session.execute(insert(QuarantineDetailORM.__table__), quarantine_rows)
+        return [row["id"] for row in product_rows]
+
     def _apply_filters(self, query, brand_slug=None, verified_only=False, search=None, category=None, exclude_kits=False, exclude_non_hair=True, include_hidden=False):
         if brand_slug:
             query = query.filter(ProductORM.brand_slug == brand_slug)
@@ -213,6 +250,51 @@ class ProductRepository:
         )
         return query.offset(offset).limit(limit).all()
 
+    def get_products_with_count(
+        self,
+        brand_slug: str | None = None,
+        verified_only: bool = False,
+        search: str | None = None,
+        category: str | None = None,
+        exclude_kits: bool = False,
+        limit: int = 100,
+        offset: int = 0,
+    ) -> tuple[list[ProductORM], int]:
+        """One page of products plus the total match count, in a single query.
+
+        The total rides along each row as ``COUNT(*) OVER ()``. Only an empty
+        page past the first (offset beyond the end) needs a separate COUNT.
+        """
+        filters = dict(
+            brand_slug=brand_slug, verified_only=verified_only, search=search, category=category, exclude_kits=exclude_kits,
+        )
+        query = self._apply_filters(self._session.query(ProductORM, func.count().over()), **filters)
+        rows = query.offset(offset).limit(limit).all()
+        if rows:
+            return [product for product, _ in rows], rows[0][1]
+        return [], (self.count_products(**filters) if offset else 0)
+
+    def iter_products(
+        self,
+        brand_slug: str | None = None,
+        verified_only: bool = False,
+        search: str | None = None,
+        limit: int | None = None,
+        batch_size: int = 500,
+    ) -> Iterator[ProductORM]:
+        """Stream products matching the listing filters, ``batch_size`` rows per fetch.
+
+        Used by exports so memory holds one batch instead of the whole result set.
+        The session must stay open until the iterator is exhausted.
+        """
+        query = self._apply_filters(
+            self._session.query(ProductORM),
+            brand_slug=brand_slug, verified_only=verified_only, search=search,
+        )
+        if limit is not None:
+            query = query.limit(limit)
+        return iter(query.yield_per(batch_size))
+
     def count_products(
         self,
         brand_slug: str | None = None,
@@ -249,6 +331,18 @@ class ProductRepository:
             "quarantined": counts.get("quarantined", 0),
         }
 
+    def count_verification_statuses(self, brand_slug: str) -> dict[str | None, int]:
+        """Raw verification_status -> count for a brand (NULL status included).
+
+        Same visibility filters as get_products, but aggregated in SQL so no
+        product rows (description, INCI, JSON columns) are loaded.
+        """
+        query = self._apply_filters(
+            self._session.query(ProductORM.verification_status, func.count(ProductORM.id)),
+            brand_slug=brand_slug,
+        )
+        return dict(query.group_by(ProductORM.verification_status).all())
+
     def get_products_without_inci(self, brand_slug: str) -> list[ProductORM]:
         """Get catalog_only products without INCI ingredients for a brand."""
         return (
@@ -328,6 +422,34 @@ class ProductRepository:
             product.product_labels = labels
             product.updated_at = datetime.now(timezone.utc)
 
+    def replace_label_results(self, labels_by_id: dict[str, dict], evidence_rows: list[dict]) -> None:
+        """Batch write of `haira labels` output for several products at once.
+
+        product_labels goes out as one executemany UPDATE by primary key, and
+        the products' `label:*` evidence is swapped with a single DELETE ... IN
+        plus one executemany INSERT (evidence_rows are ProductEvidenceORM
+        column dicts).
+        """
+        if not labels_by_id:
+            return
+        now = datetime.now(timezone.utc)
+        self._session.execute(
+            update(ProductORM),
+            [
+                {"id": product_id, "product_labels": labels, "updated_at": now}
+                for product_id, labels in labels_by_id.items()
+            ],
+        )
+        evidence = ProductEvidenceORM.__table__
+        self._session.execute(
+            delete(evidence).where(
+                evidence.c.product_id.in_(list(labels_by_id)),
+                evidence.c.field_name.like("label:%"),
+            )
+        )
+        if evidence_rows:
+            self._session.execute(insert(evidence), evidence_rows)
+
     def get_product_ingredients(self, product_id: str) -> list[ProductIngredientORM]:
         return (
             self._session.query(ProductIngredientORM)
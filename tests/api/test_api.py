@@ -1,4 +1,6 @@
 # tests/api/test_api.py
+import time
+
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
@@ -70,6 +72,176 @@ class TestHealthEndpoint:
         assert resp.json()["status"] == "ok"
 
 
+class TestRateLimit:
+    def test_bucket_exhaustion_returns_429(self, client, monkeypatch):
+        import src.api.main as api_main
+
+        monkeypatch.setattr(api_main, "_RATE_LIMIT", 2)
+        monkeypatch.setattr(api_main, "_buckets", {})
+        assert client.get("/api/products").status_code == 200
+        assert client.get("/api/products").status_code == 200
+        resp = client.get("/api/products")
+        assert resp.status_code == 429
+        # Non-API paths are not rate limited
+        assert client.get("/health").status_code == 200
+
+    def test_client_table_is_bounded(self, client, monkeypatch):
+        import src.api.main as api_main
+
+        monkeypatch.setattr(api_main, "_RATE_MAX_CLIENTS", 2)
+        monkeypatch.setattr(api_main, "_buckets", {})
+        for ip in ("1.1.1.1", "2.2.2.2", "3.3.3.3"):
+            with TestClient(app, client=(ip, 50000)) as c:
+                c.get("/api/products")
+        assert list(api_main._buckets) == ["2.2.2.2", "3.3.3.3"]
+
+
+class _FakeRedisPipeline:
+    def __init__(self, store):
+        self._store = store
+        self._ops = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def incr(self, key):
+        self._ops.append(key)
+
+    def expire(self, key, seconds):
+        pass
+
+    async def execute(self):
+        key = self._ops[0]
+        self._store[key] = self._store.get(key, 0) + 1
+        return [self._store[key], True]
+
+
+class _FakeRedis:
+    def __init__(self):
+        self.store = {}
+
+    def pipeline(self, transaction=True):
+        return _FakeRedisPipeline(self.store)
+
+
+class TestRedisRateLimit:
+    def test_shared_counter_limits_requests(self, client, monkeypatch):
+        import src.api.main as api_main
+
+        fake = _FakeRedis()
+        monkeypatch.setattr(api_main, "_redis", fake)
+        monkeypatch.setattr(api_main, "_redis_down_until", 0.0)
+        monkeypatch.setattr(api_main, "_RATE_LIMIT", 1)
+        assert client.get("/api/products").status_code == 200
+        assert client.get("/api/products").status_code == 429
+        assert list(fake.store.values()) == [2]
+
+    def test_redis_failure_falls_back_to_local_buckets(self, client, monkeypatch):
+        import src.api.main as api_main
+
+        class _Down:
+            def pipeline(self, transaction=True):
+                raise ConnectionError("redis down")
+
+        monkeypatch.setattr(api_main, "_redis", _Down())
+        monkeypatch.setattr(api_main, "_redis_down_until", 0.0)
+        monkeypatch.setattr(api_main, "_buckets", {})
+        assert client.get("/api/products").status_code == 200
+        assert "testclient" in api_main._buckets
+
+    def test_redis_failure_backs_off(self, client, monkeypatch):
+        import src.api.main as api_main
+
+        calls = []
+
+        class _Down:
+            def pipeline(self, transaction=True):
+                calls.append(1)
+                raise ConnectionError("redis down")
+
+        monkeypatch.setattr(api_main, "_redis", _Down())
+        monkeypatch.setattr(api_main, "_redis_down_until", 0.0)
+        monkeypatch.setattr(api_main, "_buckets", {})
+        for _ in range(3):
+            assert client.get("/api/products").status_code == 200
+        assert len(calls) == 1  # retried only after _REDIS_RETRY_AFTER
+
+        monkeypatch.setattr(api_main, "_redis_down_until", 0.0)  # window elapsed
+        client.get("/api/products")
+        assert len(calls) == 2
+
+
+class TestETag:
+    def test_unchanged_get_returns_304(self, client, db_session):
+        _seed_product(db_session)
+        resp = client.get("/api/products")
+        etag = resp.headers["etag"]
+        assert resp.status_code == 200
+        again = client.get("/api/products", headers={"If-None-Match": etag})
+        assert again.status_code == 304
+        assert again.content == b""
+        assert again.headers["etag"] == etag
+
+    def test_etag_is_weak_and_strong_form_still_matches(self, client, db_session):
+        _seed_product(db_session)
+        etag = client.get("/api/products").headers["etag"]
+        assert etag.startswith('W/"')
+        strong = etag.removeprefix("W/")
+        assert client.get("/api/products", headers={"If-None-Match": strong}).status_code == 304
+
+    def test_changed_body_gets_new_etag(self, client, db_session):
+        _seed_product(db_session)
+        etag = client.get("/api/products").headers["etag"]
+        _seed_product(db_session, "https://www.amend.com.br/p2")
+        resp = client.get("/api/products", headers={"If-None-Match": etag})
+        assert resp.status_code == 200
+        assert resp.headers["etag"] != etag
+        assert resp.json()["total"] == 2
+
+    def test_gzipped_repeat_request_returns_304(self, client, db_session):
+        # gzip grava o mtime (resolução de 1s) no header: o ETag não pode
+        # depender dos bytes comprimidos.
+        for i in range(20):
+            _seed_product(db_session, f"https://www.amend.com.br/gzetag{i}")
+        gz = {"Accept-Encoding": "gzip"}
+        resp = client.get("/api/products", headers=gz)
+        assert resp.headers["content-encoding"] == "gzip"
+        time.sleep(1.1)
+        again = client.get("/api/products", headers={**gz, "If-None-Match": resp.headers["etag"]})
+        assert again.status_code == 304
+
+    def test_export_is_not_buffered(self, client, db_session):
+        _seed_product(db_session)
+        resp = client.get("/api/products/export?format=csv")
+        assert "etag" not in resp.headers
+
+
+class TestCompression:
+    def test_large_json_is_gzipped(self, client, db_session):
+        for i in range(20):
+            _seed_product(db_session, f"https://www.amend.com.br/gz{i}")
+        resp = client.get("/api/products", headers={"Accept-Encoding": "gzip"})
+        assert resp.status_code == 200
+        assert resp.headers["content-encoding"] == "gzip"
+        assert resp.json()["total"] == 20
+
+    def test_etag_is_independent_of_content_encoding(self, client, db_session):
+        for i in range(20):
+            _seed_product(db_session, f"https://www.amend.com.br/gzid{i}")
+        plain = client.get("/api/products", headers={"Accept-Encoding": "identity"})
+        gz = client.get("/api/products", headers={"Accept-Encoding": "gzip"})
+        assert "content-encoding" not in plain.headers
+        assert gz.headers["content-encoding"] == "gzip"
+        assert gz.headers["etag"] == plain.headers["etag"]
+
+    def test_small_response_is_not_compressed(self, client):
+        resp = client.get("/health", headers={"Accept-Encoding": "gzip"})
+        assert "content-encoding" not in resp.headers
+
+
 class TestProductsEndpoint:
     def test_list_empty(self, client):
         resp = client.get("/api/products")
@@ -131,6 +303,15 @@ class TestProductsEndpoint:
         assert resp.status_code == 200
         assert resp.json()["product_name"] == "Shampoo Gold Black"
 
+    def test_patch_product(self, client, db_session):
+        p = _seed_product(db_session)
+        resp = client.patch(f"/api/products/{p.id}", json={"product_name": "Shampoo Renomeado", "price": 49.9})
+        assert resp.status_code == 200
+        body = resp.json()
+        assert body["product_name"] == "Shampoo Renomeado"
+        assert body["price"] == 49.9
+        assert client.patch("/api/products/nonexistent", json={"price": 1.0}).status_code == 404
+
     def test_export_csv(self, client, db_session):
         _seed_product(db_session)
         resp = client.get("/api/products/export?format=csv")
@@ -141,6 +322,21 @@ class TestProductsEndpoint:
         assert len(lines) == 2  # header + 1 product
         assert "product_name" in lines[0]
 
+    def test_export_csv_json_encodes_lists(self, client, db_session, monkeypatch):
+        import csv as _csv
+        import json
+        import src.api.routes.products as products_routes
+
+        monkeypatch.setattr(products_routes, "_EXPORT_CHUNK_ROWS", 2)
+        for i in range(5):
+            p = _seed_product(db_session, f"https://www.amend.com.br/csv{i}")
+            p.inci_ingredients = ["Aqua", "Glicerina"]
+        db_session.commit()
+        resp = client.get("/api/products/export?format=csv")
+        rows = list(_csv.DictReader(resp.text.splitlines()))
+        assert len(rows) == 5
+        assert json.loads(rows[0]["inci_ingredients"]) == ["Aqua", "Glicerina"]
+
     def test_export_json(self, client, db_session):
         _seed_product(db_session)
         resp = client.get("/api/products/export?format=json")
@@ -151,6 +347,45 @@ class TestProductsEndpoint:
         assert items[0]["product_name"] == "Shampoo Gold Black"
 
 
+class TestValidationCache:
+    def test_report_recomputed_after_update(self, client, db_session):
+        p = _seed_product(db_session)
+        first = client.get(f"/api/products/{p.id}").json()["quality"]
+        again = client.get(f"/api/products/{p.id}").json()["quality"]
+        assert again == first
+
+        p.inci_ingredients = ["Aqua", "Sodium Laureth Sulfate", "Cocamidopropyl Betaine", "Parfum", "Glycerin"]
+        db_session.commit()
+        from src.api.routes.products import _VALIDATION_CACHE
+        assert (p.id, p.updated_at) not in _VALIDATION_CACHE
+        client.get(f"/api/products/{p.id}")
+        assert (p.id, p.updated_at) in _VALIDATION_CACHE
+
+    def test_concurrent_eviction_is_safe(self, monkeypatch):
+        from concurrent.futures import ThreadPoolExecutor
+        from types import SimpleNamespace
+        from src.api.routes import products as products_mod
+
+        monkeypatch.setattr(products_mod, "_VALIDATION_CACHE", {})
+        monkeypatch.setattr(products_mod, "_VALIDATION_CACHE_MAX", 8)
+        monkeypatch.setattr(
+            products_mod, "validate_product_fields",
+            lambda **_: SimpleNamespace(to_dict=lambda: {"ok": True}),
+        )
+        fields = dict.fromkeys((
+            "product_name", "inci_ingredients", "description", "usage_instructions",
+            "benefits_claims", "price", "currency", "image_url_main", "product_type_normalized",
+        ))
+
+        def run(n):
+            for i in range(500):
+                products_mod._validate_product(SimpleNamespace(id=f"{n}-{i}", updated_at=None, **fields))
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(run, range(8)))  # re-raises any KeyError/RuntimeError
+        assert len(products_mod._VALIDATION_CACHE) <= 8
+
+
 class TestTaxonomyFieldsInAPI:
     def test_product_detail_includes_taxonomy_fields(self, client, db_session):
         from src.storage.orm_models import ProductEvidenceORM
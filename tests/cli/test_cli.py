@@ -0,0 +1,138 @@
+# tests/cli/test_cli.py
+"""CLI ponta a ponta (CliRunner) num SQLite semeado: labels, audit e report."""
+from __future__ import annotations
+
+from collections import Counter
+
+import pytest
+from click.testing import CliRunner
+from sqlalchemy.orm import Session
+
+import src.storage.database as dbmod
+from src.cli.main import cli
+from src.storage.orm_models import Base, BrandCoverageORM, ProductEvidenceORM, ProductORM
+
+
+@pytest.fixture
+def engine(monkeypatch, tmp_path):
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path / 'cli.db'}")
+    dbmod.reset_engine()
+    eng = dbmod.get_engine()
+    Base.metadata.create_all(eng)
+    yield eng
+    dbmod.reset_engine()
+
+
+def _seed_product(session, url, status="catalog_only", brand="amend", **extra):
+    p = ProductORM(
+        brand_slug=brand,
+        product_name="Shampoo Vegano Gold Black",
+        product_url=url,
+        image_url_main="https://img.com/x.jpg",
+        verification_status=status,
+        gender_target="unisex",
+        confidence=0.5,
+        **extra,
+    )
+    session.add(p)
+    return p
+
+
+def _invoke(*args):
+    result = CliRunner().invoke(cli, list(args))
+    assert result.exit_code == 0, result.output
+    return result.output
+
+
+class TestLabelsCommand:
+    def test_rerun_does_not_duplicate_label_evidence(self, engine):
+        with Session(engine) as session:
+            for i in range(3):
+                p = _seed_product(
+                    session, f"https://www.amend.com.br/l{i}",
+                    description="Fórmula vegana, sem sulfatos e cruelty free.",
+                )
+                session.flush()
+                session.add(ProductEvidenceORM(
+                    product_id=p.id, field_name="product_name",
+                    source_url=p.product_url, extraction_method="html_selector",
+                ))
+            session.commit()
+
+        def evidence_counts():
+            with Session(engine) as session:
+                return Counter(f for (f,) in session.query(ProductEvidenceORM.field_name))
+
+        _invoke("labels", "--brand", "amend")
+        first = evidence_counts()
+        _invoke("labels", "--brand", "amend")
+        assert evidence_counts() == first
+        assert first["product_name"] == 3
+        assert first["label:vegan"] == 3
+
+        with Session(engine) as session:
+            labels = [p.product_labels for p in session.query(ProductORM)]
+        assert all("vegan" in (l or {}).get("detected", []) for l in labels)
+
+    def test_dry_run_writes_nothing(self, engine):
+        with Session(engine) as session:
+            _seed_product(session, "https://www.amend.com.br/dry", description="Fórmula vegana.")
+            session.commit()
+        _invoke("labels", "--brand", "amend", "--dry-run")
+        with Session(engine) as session:
+            assert session.query(ProductEvidenceORM).count() == 0
+            assert session.query(ProductORM).one().product_labels is None
+
+
+class TestAuditCommand:
+    def test_status_breakdown_matches_per_product_tally(self, engine):
+        statuses = ["catalog_only"] * 3 + ["verified_inci"] * 2 + ["quarantined"]
+        with Session(engine) as session:
+            for i, status in enumerate(statuses):
+                _seed_product(session, f"https://www.amend.com.br/a{i}", status)
+            _seed_product(session, "https://other.com/p", "verified_inci", brand="other")
+            _seed_product(session, "https://www.amend.com.br/hidden", is_hidden=True)
+            session.commit()
+            expected = Counter(
+                p.verification_status or "unknown"
+                for p in session.query(ProductORM).filter_by(brand_slug="amend", is_hidden=False)
+            )
+
+        out = _invoke("audit", "--brand", "amend")
+        assert f"Total products in DB: {sum(expected.values())}" in out
+        for status, count in expected.items():
+            assert f"    {status}: {count}\n" in out
+
+    def test_no_data(self, engine):
+        assert "No data found for ghost" in _invoke("audit", "--brand", "ghost")
+
+
+class TestReportCommand:
+    def test_rows_ordered_and_totals_summed(self, engine):
+        with Session(engine) as session:
+            session.add_all([
+                BrandCoverageORM(brand_slug="zeta", extracted_total=10, verified_inci_total=5, verified_inci_rate=0.5),
+                BrandCoverageORM(brand_slug="alpha", extracted_total=4, verified_inci_total=None),
+                BrandCoverageORM(brand_slug="mid", extracted_total=6, verified_inci_total=3, verified_inci_rate=0.5),
+            ])
+            session.commit()
+
+        lines = _invoke("report", "--all-brands").splitlines()
+        brand_rows = [l.split()[0] for l in lines if l.split() and l.split()[0] in {"alpha", "mid", "zeta"}]
+        assert brand_rows == ["alpha", "mid", "zeta"]
+        total = next(l for l in lines if l.startswith("TOTAL")).split()
+        assert total[1:] == ["20", "8", "40.0%"]
+
+    def test_single_brand_totals(self, engine):
+        with Session(engine) as session:
+            session.add_all([
+                BrandCoverageORM(brand_slug="alpha", extracted_total=4, verified_inci_total=1),
+                BrandCoverageORM(brand_slug="zeta", extracted_total=10, verified_inci_total=5),
+            ])
+            session.commit()
+        total = next(l for l in _invoke("report", "--brand", "alpha").splitlines() if l.startswith("TOTAL"))
+        assert total.split()[1:] == ["4", "1", "25.0%"]
+
+    def test_requires_scope(self, engine):
+        result = CliRunner().invoke(cli, ["report"])
+        assert result.exit_code == 1
@@ -1,6 +1,7 @@
 # tests/core/test_browser.py
 import pytest
 from unittest.mock import MagicMock, patch
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
 from src.core.browser import BrowserClient
 
 
@@ -13,6 +14,45 @@ class TestBrowserClient:
         client = BrowserClient()
         assert client._delay == 3
 
+    def test_default_settle(self):
+        client = BrowserClient()
+        assert client._settle_ms == 2000
+
+    def test_custom_settle_used_after_navigation(self):
+        client = BrowserClient(delay_seconds=0.01, settle_ms=300)
+        client._browser = MagicMock()
+        client._page = MagicMock()
+        client._page.content.return_value = "<html></html>"
+        assert client.fetch_page("https://www.amend.com.br/p/1.html") == "<html></html>"
+        client._page.wait_for_load_state.assert_called_once_with("networkidle", timeout=300)
+        client._page.wait_for_timeout.assert_not_called()
+
+    def test_settle_timeout_is_not_an_error(self):
+        client = BrowserClient(delay_seconds=0.01, settle_ms=300)
+        client._browser = MagicMock()
+        client._page = MagicMock()
+        client._page.wait_for_load_state.side_effect = PlaywrightTimeoutError("networkidle")
+        client._page.content.return_value = "<html></html>"
+        assert client.fetch_page("https://www.amend.com.br/p/1.html") == "<html></html>"
+        client._page.goto.assert_called_once()
+
+    def test_crash_during_settle_restarts_browser(self):
+        client = BrowserClient(delay_seconds=0.01, settle_ms=300)
+        client._browser = MagicMock()
+        crashed = MagicMock()
+        crashed.wait_for_load_state.side_effect = Exception("Target crashed")
+        client._page = crashed
+        fresh = MagicMock()
+        fresh.content.return_value = "<html>ok</html>"
+
+        def restart():
+            client._page = fresh
+
+        with patch.object(client, "_restart_browser", side_effect=restart) as restart_mock:
+            assert client.fetch_page("https://www.amend.com.br/p/1.html") == "<html>ok</html>"
+        restart_mock.assert_called_once()
+        fresh.goto.assert_called_once()
+
     def test_respects_domain_allowlist(self):
         client = BrowserClient()
         assert client.is_allowed_domain("https://www.amend.com.br/produto", ["www.amend.com.br"]) is True
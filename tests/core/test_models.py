@@ -14,6 +14,15 @@ from src.core.models import (
 )
 
 
+class TestGenderTargetCoerce:
+    def test_valid_value(self):
+        assert GenderTarget.coerce("women") is GenderTarget.WOMEN
+
+    def test_invalid_or_missing_value_falls_back_to_unknown(self):
+        assert GenderTarget.coerce("female") is GenderTarget.UNKNOWN
+        assert GenderTarget.coerce(None) is GenderTarget.UNKNOWN
+
+
 class TestBrand:
     def test_create_brand(self):
         brand = Brand(
@@ -3,7 +3,7 @@ import pytest
 from pathlib import Path
 from src.extraction.deterministic import (
     extract_jsonld, extract_by_selectors, extract_product_deterministic,
-    _extract_inci_by_tab_labels, _get_soup,
+    _extract_inci_by_tab_labels, _get_soup, _compile_selector,
 )
 
 
@@ -37,6 +37,14 @@ class TestExtractBySelectors:
         result = extract_by_selectors(sample_html, name_selectors=[".product-name", "h1"])
         assert result["name"] == "Shampoo Gold Black Reparador"
 
+    def test_compiled_selectors_are_reused(self, sample_html):
+        selectors = (".product-name", "h1")
+        extract_by_selectors(sample_html, name_selectors=selectors)
+        hits_before = _compile_selector.cache_info().hits
+        result = extract_by_selectors(sample_html, name_selectors=selectors)
+        assert result["name"] == "Shampoo Gold Black Reparador"
+        assert _compile_selector.cache_info().hits > hits_before
+
 
 class TestExtractProductDeterministic:
     def test_full_extraction(self, sample_html):
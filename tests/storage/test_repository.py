@@ -55,6 +55,46 @@ class TestUpsertProduct:
         assert id1 == id2
 
 
+class TestInsertNewProducts:
+    def test_bulk_insert_with_evidence_and_quarantine(self, repo, db_session):
+        from src.storage.orm_models import ProductORM, ProductEvidenceORM, QuarantineDetailORM
+
+        ev = Evidence(
+            field_name="product_name",
+            source_url="https://www.amend.com.br/p1",
+            evidence_locator="h1",
+            raw_source_text="Shampoo Gold Black",
+            extraction_method=ExtractionMethod.HTML_SELECTOR,
+        )
+        items = [
+            (
+                _make_extraction(product_url="https://www.amend.com.br/p1", evidence=[ev]),
+                QAResult(status=QAStatus.CATALOG_ONLY, passed=True, checks_passed=[]),
+            ),
+            (
+                _make_extraction(product_url="https://www.amend.com.br/p2"),
+                QAResult(
+                    status=QAStatus.QUARANTINED, passed=False,
+                    checks_failed=["name_invalid"], rejection_reason="bad name",
+                ),
+            ),
+        ]
+        ids = repo.insert_new_products(items)
+        db_session.flush()
+
+        assert len(ids) == 2
+        products = {p.product_url: p for p in db_session.query(ProductORM).all()}
+        assert products["https://www.amend.com.br/p1"].id == ids[0]
+        assert products["https://www.amend.com.br/p2"].verification_status == "quarantined"
+        assert products["https://www.amend.com.br/p1"].gold_status == "raw"  # column default applied
+        assert db_session.query(ProductEvidenceORM).filter_by(product_id=ids[0]).count() == 1
+        q = db_session.query(QuarantineDetailORM).filter_by(product_id=ids[1]).one()
+        assert q.rejection_code == "name_invalid"
+
+    def test_empty_batch(self, repo):
+        assert repo.insert_new_products([]) == []
+
+
 class TestGetProducts:
     def test_get_verified_only(self, repo, db_session):
         e1 = _make_extraction(
@@ -74,6 +114,43 @@ class TestGetProducts:
         assert len(verified) == 1
         assert verified[0].product_name == "Shampoo Gold Black"
 
+    def test_get_products_with_count(self, repo, db_session):
+        qa = QAResult(status=QAStatus.CATALOG_ONLY, passed=True, checks_passed=[])
+        for i in range(5):
+            repo.upsert_product(_make_extraction(product_url=f"https://www.amend.com.br/wc{i}"), qa)
+        db_session.commit()
+
+        rows, total = repo.get_products_with_count(limit=2, offset=2)
+        assert len(rows) == 2
+        assert total == 5
+        rows, total = repo.get_products_with_count(limit=2, offset=10)
+        assert rows == []
+        assert total == 5
+        assert repo.get_products_with_count(search="nothing-matches") == ([], 0)
+
+    def test_iter_products_streams_in_batches(self, repo, db_session):
+        qa = QAResult(status=QAStatus.CATALOG_ONLY, passed=True, checks_passed=[])
+        for i in range(5):
+            repo.upsert_product(_make_extraction(product_url=f"https://www.amend.com.br/it{i}"), qa)
+        db_session.commit()
+
+        assert len(list(repo.iter_products(batch_size=2))) == 5
+        assert len(list(repo.iter_products(limit=3, batch_size=2))) == 3
+
+    def test_count_verification_statuses(self, repo, db_session):
+        catalog = QAResult(status=QAStatus.CATALOG_ONLY, passed=True, checks_passed=[])
+        verified = QAResult(status=QAStatus.VERIFIED_INCI, passed=True, checks_passed=[])
+        for i in range(3):
+            repo.upsert_product(_make_extraction(product_url=f"https://www.amend.com.br/vs{i}"), catalog)
+        repo.upsert_product(_make_extraction(product_url="https://www.amend.com.br/vs-v"), verified)
+        repo.upsert_product(
+            _make_extraction(brand_slug="other", product_url="https://other.com/p"), catalog,
+        )
+        db_session.commit()
+
+        assert repo.count_verification_statuses("amend") == {"catalog_only": 3, "verified_inci": 1}
+        assert repo.count_verification_statuses("missing") == {}
+
 
 class TestUpdateProductLabels:
     def test_update_product_labels(self, repo, db_session):
@@ -102,6 +179,42 @@ class TestUpdateProductLabels:
         """Calling with invalid ID should not raise."""
         repo.update_product_labels("nonexistent-id", {"detected": []})
 
+    def test_replace_label_results_swaps_only_label_evidence(self, repo, db_session):
+        from src.storage.orm_models import ProductEvidenceORM
+
+        qa = QAResult(status=QAStatus.CATALOG_ONLY, passed=True, checks_passed=["name_valid"])
+        keep = Evidence(
+            field_name="product_name",
+            source_url="https://www.amend.com.br/p1",
+            evidence_locator="h1",
+            raw_source_text="Shampoo",
+            extraction_method=ExtractionMethod.HTML_SELECTOR,
+        )
+        pid = repo.upsert_product(_make_extraction(evidence=[keep]), qa)
+        db_session.flush()
+
+        def _label_row(locator):
+            return dict(
+                product_id=pid,
+                field_name="label:vegan",
+                source_url="https://www.amend.com.br/p1",
+                evidence_locator=locator,
+                raw_source_text="vegano",
+                extraction_method="text_keyword",
+            )
+
+        repo.replace_label_results({pid: {"detected": ["vegan"]}}, [_label_row("description")])
+        repo.replace_label_results({pid: {"detected": ["vegan"]}}, [_label_row("inci")])
+        db_session.commit()
+
+        fields = sorted(
+            (e.field_name, e.evidence_locator)
+            for e in db_session.query(ProductEvidenceORM).filter_by(product_id=pid)
+        )
+        assert fields == [("label:vegan", "inci"), ("product_name", "h1")]
+        db_session.expire_all()
+        assert repo.get_product_by_id(pid).product_labels == {"detected": ["vegan"]}
+
 
 class TestTaxonomyFieldsInUpsert:
     def test_composition_and_care_usage_persisted_on_insert(self, repo, db_session):